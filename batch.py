@@ -0,0 +1,300 @@
+import os
+import re
+import json
+import hashlib
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+from src.audio_cache import atomic_write
+
+VIDEO_EXTENSIONS = ('.mp4', '.mov', '.mkv', '.avi', '.webm', '.m4v')
+OUTPUT_FORMATS = ('text', 'audio', 'video')
+DONE_MARKER = 'done.json'
+
+# Components loaded once per worker process by _init_worker
+_WORKER = {}
+
+def load_jobs(source: str, output_format: str, language: str) -> List[Dict]:
+    """
+    Build the job list from a directory of videos or a JSONL manifest.
+
+    Manifest lines are objects with an 'input' key and optional 'id',
+    'language' and 'format' keys overriding the defaults.
+
+    Args:
+        source: Directory path or path to a .jsonl manifest
+        output_format: Default output format for summary
+        language: Default language code for transcription
+
+    Returns:
+        List of job dictionaries with id, input, language and format
+
+    Raises:
+        ValueError: If an entry has an invalid id or format
+    """
+    entries = []
+    if os.path.isdir(source):
+        for name in sorted(os.listdir(source)):
+            if name.lower().endswith(VIDEO_EXTENSIONS):
+                entries.append({'input': os.path.join(source, name)})
+    else:
+        with open(source) as manifest:
+            for line_number, line in enumerate(manifest, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                entry = json.loads(line)
+                if 'input' not in entry:
+                    raise ValueError(f"Manifest line {line_number} has no 'input'")
+                entries.append(entry)
+
+    jobs = []
+    seen = set()
+    for entry in entries:
+        job_id = entry.get('id') or _job_id(entry['input'])
+        # The id names the job's output directory, so it must stay inside output_dir
+        if not isinstance(job_id, str) or not re.fullmatch(r'[A-Za-z0-9_.-]+', job_id) or job_id in ('.', '..'):
+            raise ValueError(f"Invalid job id: {job_id!r} (use letters, digits, '_', '.' and '-')")
+        if job_id in seen:
+            raise ValueError(f"Duplicate job id: {job_id}")
+        seen.add(job_id)
+
+        job_format = entry.get('format', output_format)
+        if job_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Job {job_id} has unknown format: {job_format!r}")
+
+        jobs.append({
+            'id': job_id,
+            'input': entry['input'],
+            'language': entry.get('language', language),
+            'format': job_format
+        })
+    return jobs
+
+def _job_id(input_path: str) -> str:
+    # Readable stem plus a short hash so equal file names in different places don't collide
+    stem = os.path.splitext(os.path.basename(input_path.rstrip('/')))[0]
+    stem = re.sub(r'[^A-Za-z0-9_.-]+', '_', stem)[:64] or 'video'
+    key = input_path if '://' in input_path else os.path.abspath(input_path)
+    digest = hashlib.sha256(key.encode('utf-8')).hexdigest()[:8]
+    return f"{stem}-{digest}"
+
+def is_done(output_dir: str, job: Dict) -> bool:
+    """
+    Check whether a job finished in a previous run.
+
+    Args:
+        output_dir: Root output directory of the batch
+        job: Job dictionary
+
+    Returns:
+        True if the job's completion marker exists
+    """
+    return os.path.exists(os.path.join(output_dir, job['id'], DONE_MARKER))
+
+def _init_worker(max_threads: int, cache_dir: str, spool_dir: str, spool_max_bytes: int):
+    """
+    Load models and clients once per worker process.
+    """
+    load_dotenv()
+    from src.video_processor import VideoProcessor
+    from src.transcription import TranscriptionService
+    from src.summarizer import VideoSummarizer
+    from src.audio_generator import AudioGenerator
+    from src.visualization import Visualizer
+    from src.sentiment_analyzer import SentimentAnalyzer
+    from src.artifacts import ArtifactStore
+    from src.ingest import InputSpool
+
+    _WORKER['components'] = (
+        VideoProcessor(),
+        TranscriptionService(),
+        VideoSummarizer(),
+        AudioGenerator(),
+        # Charts render in-process; the batch already keeps every core busy
+        Visualizer(workers=0),
+        SentimentAnalyzer()
+    )
+    _WORKER['max_threads'] = max_threads
+    _WORKER['store'] = ArtifactStore(cache_dir) if cache_dir else None
+    _WORKER['spool'] = InputSpool(spool_dir, max_bytes=spool_max_bytes)
+
+def _run_job(job: Dict, output_dir: str) -> Dict:
+    """
+    Run the pipeline for one job inside a worker process.
+
+    Returns:
+        Result dictionary with the job id, status and outputs or error
+    """
+    from main import build_pipeline
+
+    job_dir = os.path.join(output_dir, job['id'])
+    os.makedirs(job_dir, exist_ok=True)
+
+    try:
+        # Fetch remote inputs once; every stage then reads the local copy
+        video_path = _WORKER['spool'].resolve(job['input'])
+
+        store = _WORKER['store']
+        pipeline = build_pipeline(job['format'], *_WORKER['components'],
+                                  max_threads=_WORKER['max_threads'], store=store)
+        results = pipeline.run({
+            'video_path': video_path,
+            'language': job['language'],
+            'output_dir': job_dir
+        }, initial_keys={'video_path': store.fingerprint_input(video_path)} if store else None)
+    except Exception as e:
+        return {'id': job['id'], 'status': 'failed', 'error': str(e)}
+
+    outputs = {key: results[key] for key in ('summary_path', 'audio_path', 'video_summary_path') if key in results}
+    result = {'id': job['id'], 'status': 'done', 'input': job['input'], 'outputs': outputs}
+
+    # Written last and atomically, so a crash never leaves a job marked done
+    atomic_write(os.path.join(job_dir, DONE_MARKER), json.dumps(result).encode('utf-8'))
+    return result
+
+def run_batch(jobs: List[Dict], output_dir: str, workers: int, threads_per_worker: int,
+              cache_dir: Optional[str] = 'data/cache/artifacts',
+              spool_dir: str = 'data/cache/inputs', max_attempts: int = 3,
+              spool_max_bytes: int = 50 * 1024 ** 3) -> List[Dict]:
+    """
+    Run jobs across a pool of long-lived workers, skipping completed jobs.
+
+    If a worker process dies (out of memory, a crash in native code), the
+    pool is recreated and the unfinished jobs are resubmitted. Jobs that were
+    running at the time are retried one at a time, so a crash with a single
+    job running identifies the job that caused it; that job is given up
+    after max_attempts crashes.
+
+    Args:
+        jobs: Job dictionaries from load_jobs
+        output_dir: Root output directory; each job writes to its own subdirectory
+        workers: Number of worker processes
+        threads_per_worker: Maximum concurrent stages within each worker
+        cache_dir: Directory for stage artifacts, or None to disable reuse
+        spool_dir: Directory where remote inputs are downloaded
+        max_attempts: Maximum number of worker crashes tolerated per job
+        spool_max_bytes: Size budget of the input spool
+
+    Returns:
+        List of result dictionaries for the jobs that ran
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    todo = [job for job in jobs if not is_done(output_dir, job)]
+    print(f"{len(jobs) - len(todo)} of {len(jobs)} jobs already done, running {len(todo)}")
+
+    results = []
+    if not todo:
+        return results
+
+    def report(job: Dict, result: Dict):
+        results.append(result)
+        if result['status'] == 'done':
+            print(f"[{len(results)}/{len(todo)}] {job['id']}: done")
+        else:
+            print(f"[{len(results)}/{len(todo)}] {job['id']}: failed: {result['error']}")
+
+    queue = deque(todo)
+    # Jobs that were running when a worker died; run alone until cleared
+    suspects = deque()
+    crashes = {}
+
+    while queue or suspects:
+        crashed = []
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(threads_per_worker, cache_dir, spool_dir, spool_max_bytes)) as executor:
+            # Only as many jobs as workers are submitted, so a crash can only
+            # be caused by one of the jobs in flight
+            running = {}
+            isolating = False
+            broken = False
+            while (queue or suspects or running) and not broken:
+                while len(running) < workers and not isolating:
+                    if suspects:
+                        if running:
+                            break
+                        source, isolating = suspects, True
+                    elif queue:
+                        source = queue
+                    else:
+                        break
+                    job = source.popleft()
+                    try:
+                        running[executor.submit(_run_job, job, output_dir)] = job
+                    except BrokenProcessPool:
+                        # The pool broke since the last check; the job never ran
+                        source.appendleft(job)
+                        broken = True
+                        break
+                if broken:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job = running.pop(future)
+                    isolating = False
+                    try:
+                        report(job, future.result())
+                    except BrokenProcessPool:
+                        crashed.append(job)
+                        broken = True
+
+            # Every job still in flight was lost with the pool
+            crashed.extend(running.values())
+
+        if len(crashed) == 1:
+            job = crashed[0]
+            crashes[job['id']] = crashes.get(job['id'], 0) + 1
+            if crashes[job['id']] >= max_attempts:
+                # Not marked done, so a later run retries it
+                report(job, {'id': job['id'], 'status': 'failed',
+                             'error': f"worker process died {crashes[job['id']]} times"})
+                continue
+            print(f"{job['id']}: worker process died, retrying")
+        elif crashed:
+            print(f"A worker process died while running {len(crashed)} jobs; retrying them one at a time")
+        suspects.extend(crashed)
+
+    return results
+
+def main():
+    # Load environment variables
+    load_dotenv()
+
+    # Parse command line arguments
+    parser = argparse.ArgumentParser(description='Smart Video Summarizer (batch mode)')
+    parser.add_argument('--input', required=True, help='Directory of videos or JSONL manifest')
+    parser.add_argument('--output_dir', default='data/output', help='Root output directory; one subdirectory per job')
+    parser.add_argument('--language', default='en-US', help='Default language code for transcription')
+    parser.add_argument('--format', choices=['text', 'audio', 'video'], default='text',
+                      help='Default output format for summary')
+    parser.add_argument('--workers', type=int, default=2, help='Number of worker processes')
+    parser.add_argument('--threads_per_worker', type=int, default=4,
+                      help='Maximum concurrent stages within each worker')
+    parser.add_argument('--cache_dir', default='data/cache/artifacts',
+                      help='Directory for stage artifacts reused across runs')
+    parser.add_argument('--no_cache', action='store_true', help='Recompute every stage')
+    parser.add_argument('--spool_dir', default='data/cache/inputs',
+                      help='Directory where remote inputs are downloaded once and shared by all stages')
+    parser.add_argument('--spool_max_gb', type=float, default=50,
+                      help='Size budget of the input spool; abandoned and least recently used downloads are evicted beyond it')
+    parser.add_argument('--max_attempts', type=int, default=3,
+                      help='Give up on a job after its worker process died this many times')
+    args = parser.parse_args()
+
+    jobs = load_jobs(args.input, args.format, args.language)
+    results = run_batch(jobs, args.output_dir, args.workers, args.threads_per_worker,
+                        None if args.no_cache else args.cache_dir, args.spool_dir, args.max_attempts,
+                        int(args.spool_max_gb * 1024 ** 3))
+
+    failed = [r for r in results if r['status'] != 'done']
+    print(f"Batch finished: {len(results) - len(failed)} done, {len(failed)} failed")
+    if failed:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import math
+from types import SimpleNamespace
+from typing import List
+
+WORDS = ('the patient was stable during the procedure and the team reviewed the imaging '
+         'before closing the incision with standard sutures while monitoring vital signs').split()
+
+def synthetic_transcript(seconds: float, words_per_second: float = 2.5, sentence_length: int = 12) -> str:
+    """
+    Build deterministic transcript text with the word rate of normal speech.
+
+    Args:
+        seconds: Length of the speech in seconds
+        words_per_second: Speaking rate
+        sentence_length: Words per sentence
+
+    Returns:
+        Transcript text made of period-terminated sentences
+    """
+    words = [WORDS[i % len(WORDS)] for i in range(max(1, int(seconds * words_per_second)))]
+    sentences = [' '.join(words[i:i + sentence_length]) for i in range(0, len(words), sentence_length)]
+    return ' '.join(s.capitalize() + '.' for s in sentences)
+
+def _duration(seconds: float) -> SimpleNamespace:
+    return SimpleNamespace(seconds=int(seconds), nanos=int((seconds - int(seconds)) * 1e9))
+
+class FakeSpeechClient:
+    """
+    Local stand-in for speech.SpeechClient.
+
+    recognize() returns a response shaped like the real one, with a
+    transcript whose length matches the submitted LINEAR16 audio.
+    """
+    def __init__(self, words_per_second: float = 2.5, result_seconds: float = 30.0):
+        self.words_per_second = words_per_second
+        self.result_seconds = result_seconds
+
+    def recognize(self, config, audio):
+        # 16-bit mono samples
+        seconds = len(audio.content) / (2 * config.sample_rate_hertz)
+
+        results = []
+        for index in range(max(1, math.ceil(seconds / self.result_seconds))):
+            start = index * self.result_seconds
+            span = min(self.result_seconds, seconds - start)
+            text = synthetic_transcript(span, self.words_per_second)
+            results.append(SimpleNamespace(alternatives=[SimpleNamespace(
+                transcript=text,
+                words=self._words(text, start, span)
+            )]))
+        return SimpleNamespace(results=results)
+
+    def _words(self, text: str, start: float, span: float) -> List[SimpleNamespace]:
+        words = text.split()
+        step = span / max(1, len(words))
+        return [
+            SimpleNamespace(word=word, start_time=_duration(start + i * step),
+                            end_time=_duration(start + (i + 1) * step))
+            for i, word in enumerate(words)
+        ]
+
+class FakeTextToSpeechClient:
+    """
+    Local stand-in for texttospeech.TextToSpeechClient.
+
+    synthesize_speech() returns silent MP3 audio roughly as long as the
+    text would take to read.
+    """
+    def __init__(self, silent_clip: bytes, chars_per_second: float = 15.0):
+        # One-second clip; MP3 frames can be concatenated to make longer audio
+        self.silent_clip = silent_clip
+        self.chars_per_second = chars_per_second
+        self.calls = 0
+
+    def synthesize_speech(self, input, voice, audio_config):
+        self.calls += 1
+        seconds = max(1, round(len(input.text) / self.chars_per_second))
+        return SimpleNamespace(audio_content=self.silent_clip * seconds)
@@ -0,0 +1,78 @@
+import os
+import ffmpeg
+
+def generate_video(output_dir: str, duration: float, width: int = 1280, height: int = 720, fps: int = 30,
+                   audio: str = 'sine') -> str:
+    """
+    Generate a synthetic test video with ffmpeg lavfi sources.
+
+    Videos are cached by their parameters, so repeated benchmark runs
+    reuse them.
+
+    Args:
+        output_dir: Directory to store the generated video
+        duration: Length in seconds
+        width: Frame width in pixels
+        height: Frame height in pixels
+        fps: Frame rate
+        audio: 'sine' for a test tone or 'silence' for a silent track
+
+    Returns:
+        Path to the generated video
+    """
+    try:
+        os.makedirs(output_dir, exist_ok=True)
+        output_path = os.path.join(output_dir, f'testsrc_{int(duration)}s_{width}x{height}_{fps}fps_{audio}.mp4')
+        if os.path.exists(output_path):
+            return output_path
+
+        video = ffmpeg.input(f'testsrc=size={width}x{height}:rate={fps}', f='lavfi', t=duration)
+        if audio == 'sine':
+            sound = ffmpeg.input('sine=frequency=440:sample_rate=44100', f='lavfi', t=duration)
+        elif audio == 'silence':
+            sound = ffmpeg.input('anullsrc=channel_layout=mono:sample_rate=44100', f='lavfi', t=duration)
+        else:
+            raise ValueError(f"Unknown audio source: {audio}")
+
+        # Write under a temporary name so an interrupted run never leaves a truncated cached video
+        tmp_path = output_path + '.part.mp4'
+        stream = ffmpeg.output(
+            video,
+            sound,
+            tmp_path,
+            vcodec='libx264',
+            preset='ultrafast',
+            g=fps * 2,
+            acodec='aac'
+        )
+        ffmpeg.run(stream, overwrite_output=True, quiet=True)
+        os.replace(tmp_path, output_path)
+
+        return output_path
+
+    except Exception as e:
+        raise Exception(f"Error generating synthetic video: {str(e)}")
+
+def generate_silent_mp3(output_dir: str, duration: float = 1.0) -> bytes:
+    """
+    Generate a short silent MP3 clip with the anullsrc source.
+
+    Args:
+        output_dir: Directory to store the clip
+        duration: Length in seconds
+
+    Returns:
+        Encoded MP3 bytes
+    """
+    try:
+        os.makedirs(output_dir, exist_ok=True)
+        output_path = os.path.join(output_dir, f'silence_{duration}s.mp3')
+        if not os.path.exists(output_path):
+            sound = ffmpeg.input('anullsrc=channel_layout=mono:sample_rate=24000', f='lavfi', t=duration)
+            ffmpeg.run(ffmpeg.output(sound, output_path, acodec='libmp3lame'), overwrite_output=True, quiet=True)
+
+        with open(output_path, 'rb') as clip_file:
+            return clip_file.read()
+
+    except Exception as e:
+        raise Exception(f"Error generating silent clip: {str(e)}")
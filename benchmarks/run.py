@@ -0,0 +1,141 @@
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import subprocess
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
+
+# Allow running as a script as well as with python -m benchmarks.run
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.media import generate_video
+from benchmarks.suite import BENCHMARKS, run_case
+
+PRESETS = {'1m': 60, '10m': 600, '2h': 7200}
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+def run_benchmarks(names: List[str], durations: List[float], resolutions: List[str], fps: int,
+                   media_dir: str) -> Dict:
+    """
+    Run every benchmark for every input size, each case in a fresh process.
+
+    Args:
+        names: Benchmark names
+        durations: Input lengths in seconds
+        resolutions: Frame sizes as WIDTHxHEIGHT strings
+        fps: Frame rate of the synthetic videos
+        media_dir: Directory for cached synthetic videos
+
+    Returns:
+        Dictionary with run metadata and all results
+    """
+    results = []
+    for resolution in resolutions:
+        width, height = (int(v) for v in resolution.split('x'))
+        for duration in durations:
+            print(f"Generating {duration:.0f}s {resolution} input...")
+            video_path = generate_video(media_dir, duration, width, height, fps)
+
+            for name in names:
+                print(f"  {name}...", end=' ', flush=True)
+                # A spawned process per case keeps peak memory and model caches independent
+                with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as pool:
+                    result = pool.submit(run_case, name, video_path, duration).result()
+                result['resolution'] = resolution
+                result['fps'] = fps
+                results.append(result)
+                print(f"{result['wall_time']:.2f}s, {result['realtime_factor']:.1f}x realtime, "
+                      f"peak {result['peak_rss_mb']:.0f} MB (+{result['run_rss_mb']:.0f} MB over setup)")
+
+    return {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'results': results
+    }
+
+def compare(baseline_path: str, candidate_path: str):
+    """
+    Print the change in wall time and run memory (peak RSS growth over
+    setup) between two result files.
+
+    Args:
+        baseline_path: Results JSON of the reference run
+        candidate_path: Results JSON of the run to compare
+    """
+    with open(baseline_path) as baseline_file:
+        baseline = json.load(baseline_file)
+    with open(candidate_path) as candidate_file:
+        candidate = json.load(candidate_file)
+
+    def index(run):
+        return {(r['benchmark'], r['input_seconds'], r['resolution']): r for r in run['results']}
+
+    base, cand = index(baseline), index(candidate)
+    print(f"baseline {baseline['commit']} ({baseline['created_at']}) vs "
+          f"candidate {candidate['commit']} ({candidate['created_at']})")
+    print(f"{'benchmark':<16} {'input':>7} {'resolution':>10} {'wall':>9} {'change':>8} {'run MB':>9} {'change':>8}")
+    for key in sorted(base.keys() & cand.keys()):
+        b, c = base[key], cand[key]
+        wall_change = (c['wall_time'] / b['wall_time'] - 1) * 100 if b['wall_time'] else 0.0
+        rss_change = (c['run_rss_mb'] / b['run_rss_mb'] - 1) * 100 if b['run_rss_mb'] else 0.0
+        print(f"{key[0]:<16} {key[1]:>6.0f}s {key[2]:>10} {c['wall_time']:>8.2f}s {wall_change:>+7.1f}% "
+              f"{c['run_rss_mb']:>9.0f} {rss_change:>+7.1f}%")
+
+def _parse_durations(value: str) -> List[float]:
+    return [float(PRESETS.get(v, v)) for v in value.split(',')]
+
+def main():
+    parser = argparse.ArgumentParser(description='Smart Video Summarizer benchmarks')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='Run benchmarks and store the results')
+    run_parser.add_argument('--benchmarks', default=','.join(BENCHMARKS),
+                            help=f"Comma-separated benchmarks ({', '.join(BENCHMARKS)})")
+    run_parser.add_argument('--durations', default='1m,10m',
+                            help=f"Comma-separated input lengths in seconds or presets ({', '.join(PRESETS)})")
+    run_parser.add_argument('--resolutions', default='1280x720', help='Comma-separated WIDTHxHEIGHT sizes')
+    run_parser.add_argument('--fps', type=int, default=30, help='Frame rate of the synthetic videos')
+    run_parser.add_argument('--media_dir', default='data/benchmarks/media', help='Cache for synthetic videos')
+    run_parser.add_argument('--results_dir', default='data/benchmarks/results', help='Directory for result files')
+    run_parser.add_argument('--name', help='Result file name (default: timestamp and commit)')
+
+    compare_parser = subparsers.add_parser('compare', help='Compare two result files')
+    compare_parser.add_argument('baseline', help='Results JSON of the reference run')
+    compare_parser.add_argument('candidate', help='Results JSON of the run to compare')
+
+    args = parser.parse_args()
+
+    if args.command == 'compare':
+        compare(args.baseline, args.candidate)
+        return
+
+    names = args.benchmarks.split(',')
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"Unknown benchmarks: {', '.join(unknown)}")
+
+    report = run_benchmarks(names, _parse_durations(args.durations), args.resolutions.split(','),
+                            args.fps, args.media_dir)
+
+    os.makedirs(args.results_dir, exist_ok=True)
+    name = args.name or f"{time.strftime('%Y%m%d-%H%M%S')}-{report['commit']}"
+    output_path = os.path.join(args.results_dir, f'{name}.json')
+    with open(output_path, 'w') as output_file:
+        json.dump(report, output_file, indent=2)
+    print(f"Results saved to: {output_path}")
+
+if __name__ == "__main__":
+    main()
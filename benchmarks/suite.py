@@ -0,0 +1,142 @@
+import os
+import time
+import shutil
+import tempfile
+from typing import Any, Callable, Dict
+from benchmarks.fakes import FakeSpeechClient, FakeTextToSpeechClient, synthetic_transcript
+from benchmarks.media import generate_silent_mp3
+from src.profiling import Profiler, peak_rss_mb
+
+def _bench_video_processor(video_path: str, duration: float, work_dir: str):
+    from src.video_processor import VideoProcessor
+    processor = VideoProcessor()
+
+    def run():
+        frames = processor.process_video(video_path)
+        return {'frames': len(frames)}
+    return run
+
+def _bench_summarizer(video_path: str, duration: float, work_dir: str):
+    from src.summarizer import VideoSummarizer
+    summarizer = VideoSummarizer()
+    text = synthetic_transcript(duration)
+
+    def run():
+        summarizer.summarize(text)
+        return {'words': len(text.split())}
+    return run
+
+def _bench_sentiment(video_path: str, duration: float, work_dir: str):
+    from src.sentiment_analyzer import SentimentAnalyzer
+    analyzer = SentimentAnalyzer()
+    text = synthetic_transcript(duration)
+
+    def run():
+        scores = analyzer.analyze(text)
+        return {'sentences': len(scores)}
+    return run
+
+def _bench_visualizer(video_path: str, duration: float, work_dir: str):
+    from src.video_processor import VideoProcessor
+    from src.visualization import Visualizer
+
+    # Inputs are prepared outside the timed region; one synthetic score per sentence
+    frames = VideoProcessor().process_video(video_path)
+    sentences = synthetic_transcript(duration).count('.')
+    sentiment = {i: ((i % 7) - 3) / 3 for i in range(sentences)}
+    visualizer = Visualizer()
+
+    def run():
+        visualizer.create_visualizations(frames, sentiment, os.path.join(work_dir, 'visualizations'))
+        visualizer.close()
+        return {'frames': len(frames), 'points': len(sentiment)}
+    return run
+
+def _bench_end_to_end(video_path: str, duration: float, work_dir: str):
+    from main import build_pipeline
+    from src.video_processor import VideoProcessor
+    from src.transcription import TranscriptionService
+    from src.summarizer import VideoSummarizer
+    from src.audio_generator import AudioGenerator
+    from src.visualization import Visualizer
+    from src.sentiment_analyzer import SentimentAnalyzer
+
+    components = (
+        VideoProcessor(),
+        TranscriptionService(client=FakeSpeechClient()),
+        VideoSummarizer(),
+        AudioGenerator(cache_dir=os.path.join(work_dir, 'audio_cache'),
+                       client=FakeTextToSpeechClient(generate_silent_mp3(work_dir))),
+        Visualizer(),
+        SentimentAnalyzer()
+    )
+    output_dir = os.path.join(work_dir, 'output')
+    os.makedirs(output_dir, exist_ok=True)
+
+    def run():
+        try:
+            # No artifact store: every stage is computed
+            pipeline = build_pipeline('audio', *components)
+            results = pipeline.run({'video_path': video_path, 'language': 'en-US', 'output_dir': output_dir})
+        finally:
+            components[4].close()
+        return {'words': len(results['transcription'].split()), 'frames': len(results['frame_features']['times'])}
+    return run
+
+BENCHMARKS: Dict[str, Callable] = {
+    'video_processor': _bench_video_processor,
+    'summarizer': _bench_summarizer,
+    'sentiment': _bench_sentiment,
+    'visualizer': _bench_visualizer,
+    'end_to_end': _bench_end_to_end,
+}
+
+def run_case(name: str, video_path: str, duration: float) -> Dict[str, Any]:
+    """
+    Run one benchmark case. Meant to be called in a fresh process so that
+    peak memory reflects this case alone.
+
+    Args:
+        name: Benchmark name from BENCHMARKS
+        video_path: Path to the synthetic input video
+        duration: Length of the input in seconds
+
+    Returns:
+        Dictionary with timings, memory and throughput
+    """
+    work_dir = tempfile.mkdtemp(prefix='bench-')
+    try:
+        setup_start = time.perf_counter()
+        run = BENCHMARKS[name](video_path, duration, work_dir)
+        setup_time = time.perf_counter() - setup_start
+
+        # Sample RSS while the case runs so its peak is not hidden by setup
+        # (model loading, input decoding) in the lifetime maximum
+        profiler = Profiler()
+        start = time.perf_counter()
+        cpu_start = time.process_time()
+        with profiler.measure(name, 'benchmark') as record:
+            items = run()
+        wall = time.perf_counter() - start
+        cpu = time.process_time() - cpu_start
+        rss = record.result['rss_mb']
+
+        return {
+            'benchmark': name,
+            'input_seconds': duration,
+            'setup_time': setup_time,
+            'wall_time': wall,
+            'cpu_time': cpu,
+            'setup_rss_mb': rss['start'],
+            'peak_rss_mb': rss['peak'],
+            # Growth over setup_rss_mb during the run, i.e. the memory the case itself needs
+            'run_rss_mb': rss['peak_delta'],
+            # Largest worker process, e.g. process pipeline stages or chart renderers
+            'peak_child_rss_mb': peak_rss_mb()['children'],
+            # Seconds of input processed per second of wall time
+            'realtime_factor': duration / wall if wall > 0 else None,
+            'items': items,
+            'items_per_second': {key: value / wall for key, value in items.items() if wall > 0}
+        }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
@@ -7,6 +7,91 @@ from src.summarizer import VideoSummarizer
 from src.audio_generator import AudioGenerator
 from src.visualization import Visualizer
 from src.sentiment_analyzer import SentimentAnalyzer
+from src.pipeline import Pipeline
+from src.artifacts import ArtifactStore
+from src.ingest import InputSpool
+from src.profiling import Profiler, enable as enable_profiling, measure
+
+def build_pipeline(output_format, video_processor, transcription_service, summarizer,
+                   audio_generator, visualizer, sentiment_analyzer, max_threads=4, store=None,
+                   max_length=150, min_length=30) -> Pipeline:
+    """
+    Build the stage graph for a single video.
+
+    Args:
+        output_format: Output format for summary ('text', 'audio' or 'video')
+        max_threads: Maximum number of thread stages running at once
+        store: Optional ArtifactStore for reusing stage outputs across runs
+        max_length: Maximum length of the summary
+        min_length: Minimum length of the summary
+
+    Returns:
+        Pipeline whose run() expects video_path, language and output_dir
+    """
+    def analyze_frames(video_path):
+        print("Processing video...")
+        return video_processor.analyze_video(video_path)
+
+    def transcribe(video_path, language):
+        print("Generating transcription...")
+        return transcription_service.transcribe(video_path, language)
+
+    def summarize(transcription):
+        print("Generating summary...")
+        return summarizer.summarize(transcription, max_length=max_length, min_length=min_length)
+
+    def analyze_sentiment(transcription):
+        print("Analyzing sentiment...")
+        return sentiment_analyzer.analyze(transcription)
+
+    def visualize(frame_features, sentiment, output_dir):
+        print("Generating visualizations...")
+        visualizer.create_feature_visualizations(frame_features, sentiment, output_dir)
+
+    def save_summary(summary, output_dir):
+        output_path = os.path.join(output_dir, 'summary.txt')
+        with open(output_path, 'w') as f:
+            f.write(summary)
+        return output_path
+
+    def generate_audio(summary, language, output_dir):
+        print("Generating audio summary...")
+        return audio_generator.generate_audio(summary, language, output_dir)
+
+    def render_video(video_path, frame_features, audio_path, output_dir):
+        # Render the video summary from the detected scene changes
+        print("Rendering video summary...")
+        segments = audio_generator.renderer.segments_from_scene_changes(frame_features['scene_times'])
+        return audio_generator.create_video_summary(video_path, audio_path, output_dir, segments)
+
+    # Stages with a cache config are stored as artifacts keyed by their
+    # inputs, this config and the code version
+    pipeline = Pipeline(max_threads=max_threads, store=store)
+    # Frames are decoded in a thread (OpenCV releases the GIL) and reduced to
+    # compact per-sample features as they are read, so no stage holds the raw
+    # frames and the features are cheap to store and reuse
+    pipeline.add_stage('frame_features', analyze_frames, ['video_path'], ['frame_features'],
+                       cache={'frame_interval': video_processor.frame_interval,
+                              'scene_threshold': video_processor.scene_threshold})
+    pipeline.add_stage('transcription', transcribe, ['video_path', 'language'], ['transcription'],
+                       cache={})
+    pipeline.add_stage('summary', summarize, ['transcription'], ['summary'],
+                       cache={'model': summarizer.model_name,
+                              'max_length': max_length, 'min_length': min_length})
+    pipeline.add_stage('sentiment', analyze_sentiment, ['transcription'], ['sentiment'],
+                       cache={'model': sentiment_analyzer.model_name})
+    pipeline.add_stage('visualization', visualize, ['frame_features', 'sentiment', 'output_dir'])
+    pipeline.add_stage('save_summary', save_summary, ['summary', 'output_dir'], ['summary_path'], kind='inline')
+
+    # Generate audio summary if requested
+    if output_format in ['audio', 'video']:
+        pipeline.add_stage('audio', generate_audio, ['summary', 'language', 'output_dir'], ['audio_path'])
+    if output_format == 'video':
+        pipeline.add_stage('video', render_video,
+                           ['video_path', 'frame_features', 'audio_path', 'output_dir'],
+                           ['video_summary_path'])
+
+    return pipeline
 
 def main():
     # Load environment variables
@@ -19,55 +104,75 @@ def main():
     parser.add_argument('--language', default='en-US', help='Language code for transcription')
     parser.add_argument('--format', choices=['text', 'audio', 'video'], default='text',
                       help='Output format for summary')
+    parser.add_argument('--max_length', type=int, default=150, help='Maximum length of the summary')
+    parser.add_argument('--min_length', type=int, default=30, help='Minimum length of the summary')
+    parser.add_argument('--cache_dir', default='data/cache/artifacts',
+                      help='Directory for stage artifacts reused across runs')
+    parser.add_argument('--no_cache', action='store_true', help='Recompute every stage')
+    parser.add_argument('--cache_max_gb', type=float, default=20,
+                      help='Size budget of the artifact cache; least recently used artifacts are evicted beyond it')
+    parser.add_argument('--spool_dir', default='data/cache/inputs',
+                      help='Directory where remote inputs are downloaded once and shared by all stages')
+    parser.add_argument('--spool_max_gb', type=float, default=50,
+                      help='Size budget of the input spool; abandoned and least recently used downloads are evicted beyond it')
+    parser.add_argument('--profile', action='store_true',
+                      help='Record time, CPU, memory and throughput per stage and call')
+    parser.add_argument('--profile_output', help='Path of the JSON profile report (default: <output_dir>/profile.json)')
+    parser.add_argument('--cprofile', help='Also write cProfile statistics for all stages to this .prof file')
     args = parser.parse_args()
 
     # Create output directory if it doesn't exist
     os.makedirs(args.output_dir, exist_ok=True)
 
+    profiler = None
+    if args.profile or args.cprofile:
+        profiler = Profiler(cprofile=bool(args.cprofile))
+        enable_profiling(profiler)
+
     try:
         # Initialize components
-        video_processor = VideoProcessor()
-        transcription_service = TranscriptionService()
-        summarizer = VideoSummarizer()
-        audio_generator = AudioGenerator()
-        visualizer = Visualizer()
-        sentiment_analyzer = SentimentAnalyzer()
-
-        # Process video
-        print("Processing video...")
-        frames = video_processor.process_video(args.input)
-        
-        # Generate transcription
-        print("Generating transcription...")
-        transcription = transcription_service.transcribe(args.input, args.language)
-        
-        # Generate summary
-        print("Generating summary...")
-        summary = summarizer.summarize(transcription)
-        
-        # Analyze sentiment
-        print("Analyzing sentiment...")
-        sentiment = sentiment_analyzer.analyze(transcription)
-        
-        # Generate visualizations
-        print("Generating visualizations...")
-        visualizer.create_visualizations(frames, sentiment, args.output_dir)
-        
-        # Generate audio summary if requested
-        if args.format in ['audio', 'video']:
-            print("Generating audio summary...")
-            audio_path = audio_generator.generate_audio(summary, args.language, args.output_dir)
-        
-        # Save summary
-        output_path = os.path.join(args.output_dir, 'summary.txt')
-        with open(output_path, 'w') as f:
-            f.write(summary)
-        
-        print(f"Summary saved to: {output_path}")
+        with measure('initialize', 'stage'):
+            video_processor = VideoProcessor()
+            transcription_service = TranscriptionService()
+            summarizer = VideoSummarizer()
+            audio_generator = AudioGenerator()
+            visualizer = Visualizer()
+            sentiment_analyzer = SentimentAnalyzer()
+        store = None if args.no_cache else ArtifactStore(args.cache_dir,
+                                                         max_bytes=int(args.cache_max_gb * 1024 ** 3))
+
+        # Fetch remote inputs once; every stage then reads the local copy
+        with measure('ingest', 'stage'):
+            spool = InputSpool(args.spool_dir, max_bytes=int(args.spool_max_gb * 1024 ** 3))
+            video_path = spool.resolve(args.input)
+
+        # Declare the stages; independent ones (frames and transcription,
+        # summary and sentiment) run concurrently
+        pipeline = build_pipeline(args.format, video_processor, transcription_service, summarizer,
+                                  audio_generator, visualizer, sentiment_analyzer, store=store,
+                                  max_length=args.max_length, min_length=args.min_length)
+        try:
+            results = pipeline.run({
+                'video_path': video_path,
+                'language': args.language,
+                'output_dir': args.output_dir
+            }, initial_keys={'video_path': store.fingerprint_input(video_path)} if store else None)
+        finally:
+            visualizer.close()
+
+        if 'video_summary_path' in results:
+            print(f"Video summary saved to: {results['video_summary_path']}")
+        print(f"Summary saved to: {results['summary_path']}")
         
     except Exception as e:
         print(f"Error processing video: {str(e)}")
         raise
 
+    finally:
+        if profiler is not None:
+            report_path = profiler.write(args.profile_output or os.path.join(args.output_dir, 'profile.json'),
+                                         args.cprofile)
+            print(f"Profile saved to: {report_path}")
+
 if __name__ == "__main__":
     main() 
\ No newline at end of file
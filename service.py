@@ -0,0 +1,317 @@
+import os
+import json
+import time
+import uuid
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from dotenv import load_dotenv
+from src.video_processor import VideoProcessor
+from src.transcription import TranscriptionService
+from src.summarizer import VideoSummarizer
+from src.audio_generator import AudioGenerator
+from src.visualization import Visualizer
+from src.sentiment_analyzer import SentimentAnalyzer
+from src.artifacts import ArtifactStore
+from src.batching import MicroBatcher, QueueFullError
+from src.ingest import InputSpool
+from main import build_pipeline
+
+class BatchedSummarizer:
+    def __init__(self, summarizer: VideoSummarizer, max_batch_size: int, max_wait: float):
+        """
+        Route summarization from concurrent jobs through shared model batches.
+        """
+        self.summarizer = summarizer
+        self.model_name = summarizer.model_name
+        self.batcher = MicroBatcher(self._summarize_batch, max_batch_size, max_wait, name='summarizer')
+
+    def summarize(self, text: str, max_length: int = 150, min_length: int = 30) -> str:
+        return self.summarizer.summarize(
+            text, max_length, min_length,
+            summarize_chunks=lambda chunks: self.batcher.map([(c, max_length, min_length) for c in chunks])
+        )
+
+    def _summarize_batch(self, items: List[tuple]) -> List[str]:
+        # Jobs may ask for different summary lengths; each length pair is one model call
+        results = [None] * len(items)
+        groups = {}
+        for index, (chunk, max_length, min_length) in enumerate(items):
+            groups.setdefault((max_length, min_length), []).append(index)
+        for (max_length, min_length), indices in groups.items():
+            summaries = self.summarizer.summarize_chunks([items[i][0] for i in indices], max_length, min_length)
+            for i, summary in zip(indices, summaries):
+                results[i] = summary
+        return results
+
+class BatchedSentimentAnalyzer:
+    def __init__(self, analyzer: SentimentAnalyzer, max_batch_size: int, max_wait: float):
+        """
+        Route sentiment scoring from concurrent jobs through shared model batches.
+        """
+        self.analyzer = analyzer
+        self.model_name = analyzer.model_name
+        self.batcher = MicroBatcher(analyzer.score_sentences, max_batch_size, max_wait, name='sentiment')
+
+    def analyze(self, text: str) -> Dict[str, float]:
+        return self.analyzer.analyze(text, score_sentences=self.batcher.map)
+
+class JobManager:
+    def __init__(self, components: tuple, output_root: str, store: Optional[ArtifactStore],
+                 max_jobs: int = 4, max_queued: int = 16, spool: Optional[InputSpool] = None,
+                 max_finished: int = 1000, finished_ttl: float = 3600.0):
+        """
+        Run submitted jobs on warm components with bounded concurrency.
+
+        Args:
+            components: Pipeline components, in build_pipeline order
+            output_root: Root output directory; each job writes to its own subdirectory
+            store: Optional ArtifactStore for reusing stage outputs
+            max_jobs: Maximum number of jobs running at once
+            max_queued: Maximum number of jobs waiting to run before new
+                submissions are rejected
+            spool: Spool for remote inputs
+            max_finished: Maximum number of done or failed jobs kept for
+                status and result requests
+            finished_ttl: Seconds a done or failed job is kept
+        """
+        self.components = components
+        self.output_root = output_root
+        self.store = store
+        self.spool = spool or InputSpool()
+        self.capacity = max_jobs + max_queued
+        self.max_finished = max_finished
+        self.finished_ttl = finished_ttl
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_jobs, thread_name_prefix='job')
+
+    def submit(self, request: Dict[str, Any]) -> str:
+        """
+        Accept a job for processing.
+
+        Args:
+            request: Job parameters: input (required), language, format,
+                max_length and min_length
+
+        Returns:
+            Job id
+
+        Raises:
+            QueueFullError: If too many jobs are queued or running
+        """
+        if 'input' not in request:
+            raise ValueError("Missing 'input'")
+        if request.get('format', 'text') not in ('text', 'audio', 'video'):
+            raise ValueError(f"Unknown format: {request['format']}")
+
+        with self._lock:
+            self._prune()
+            active = sum(1 for job in self.jobs.values() if job['status'] in ('queued', 'running'))
+            if active >= self.capacity:
+                raise QueueFullError(f"{active} jobs queued or running")
+
+            job_id = uuid.uuid4().hex
+            self.jobs[job_id] = {
+                'id': job_id,
+                'status': 'queued',
+                'input': request['input'],
+                'language': request.get('language', 'en-US'),
+                'format': request.get('format', 'text'),
+                'max_length': int(request.get('max_length', 150)),
+                'min_length': int(request.get('min_length', 30)),
+                'result': None,
+                'error': None,
+                'finished_at': None
+            }
+
+        self._executor.submit(self._run, job_id)
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            self._prune()
+            counts = {}
+            for job in self.jobs.values():
+                counts[job['status']] = counts.get(job['status'], 0) + 1
+        return counts
+
+    def _set(self, job_id: str, **fields):
+        if fields.get('status') in ('done', 'failed'):
+            fields['finished_at'] = time.monotonic()
+        with self._lock:
+            self.jobs[job_id].update(fields)
+
+    def _prune(self):
+        """
+        Forget finished jobs past their TTL, and the oldest ones beyond
+        max_finished, so a long-running service does not grow without bound.
+        Called with the lock held.
+        """
+        finished = sorted(
+            (job['finished_at'], job_id) for job_id, job in self.jobs.items() if job['finished_at'] is not None
+        )
+        expire_before = time.monotonic() - self.finished_ttl
+        excess = len(finished) - self.max_finished
+        for index, (finished_at, job_id) in enumerate(finished):
+            if finished_at >= expire_before and index >= excess:
+                break
+            del self.jobs[job_id]
+
+    def _run(self, job_id: str):
+        job = self.get(job_id)
+        self._set(job_id, status='running')
+
+        output_dir = os.path.join(self.output_root, job_id)
+        os.makedirs(output_dir, exist_ok=True)
+
+        try:
+            # Fetch remote inputs once; every stage then reads the local copy
+            video_path = self.spool.resolve(job['input'])
+
+            pipeline = build_pipeline(job['format'], *self.components, store=self.store,
+                                      max_length=job['max_length'], min_length=job['min_length'])
+            initial_keys = {'video_path': self.store.fingerprint_input(video_path)} if self.store else None
+            results = pipeline.run({
+                'video_path': video_path,
+                'language': job['language'],
+                'output_dir': output_dir
+            }, initial_keys=initial_keys)
+
+            result = {'summary': results['summary']}
+            for key in ('summary_path', 'audio_path', 'video_summary_path'):
+                if key in results:
+                    result[key] = results[key]
+            self._set(job_id, status='done', result=result)
+
+        except Exception as e:
+            self._set(job_id, status='failed', error=str(e))
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    # Set on the handler class by serve()
+    manager: JobManager = None
+
+    def do_POST(self):
+        if self.path != '/jobs':
+            return self._send(404, {'error': 'Not found'})
+
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length) or b'{}')
+            job_id = self.manager.submit(request)
+        except QueueFullError as e:
+            return self._send(503, {'error': str(e)}, {'Retry-After': '5'})
+        except (ValueError, TypeError) as e:
+            return self._send(400, {'error': str(e)})
+
+        self._send(202, {'id': job_id, 'status': 'queued'}, {'Location': f'/jobs/{job_id}'})
+
+    def do_GET(self):
+        parts = [part for part in self.path.split('/') if part]
+
+        if parts == ['health']:
+            return self._send(200, {'status': 'ok', 'jobs': self.manager.stats()})
+
+        if len(parts) in (2, 3) and parts[0] == 'jobs':
+            job = self.manager.get(parts[1])
+            if job is None:
+                return self._send(404, {'error': 'Unknown job'})
+
+            if len(parts) == 2:
+                return self._send(200, {key: job[key] for key in ('id', 'status', 'input', 'format', 'error')})
+
+            if parts[2] == 'result':
+                if job['status'] == 'failed':
+                    return self._send(500, {'id': job['id'], 'status': job['status'], 'error': job['error']})
+                if job['status'] != 'done':
+                    return self._send(409, {'id': job['id'], 'status': job['status']})
+                return self._send(200, {'id': job['id'], 'status': job['status'], **job['result']})
+
+        self._send(404, {'error': 'Not found'})
+
+    def _send(self, code: int, body: Dict, headers: Optional[Dict[str, str]] = None):
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+def create_manager(output_dir: str, cache_dir: Optional[str], max_jobs: int, max_queued: int,
+                   batch_size: int, batch_wait: float, spool_dir: str = 'data/cache/inputs',
+                   max_finished: int = 1000, finished_ttl: float = 3600.0,
+                   spool_max_bytes: int = 50 * 1024 ** 3) -> JobManager:
+    """
+    Load the models once and wrap them for cross-request batching.
+    """
+    components = (
+        VideoProcessor(),
+        TranscriptionService(),
+        BatchedSummarizer(VideoSummarizer(), batch_size, batch_wait),
+        AudioGenerator(),
+        # A long-lived chart pool amortizes its startup over many jobs. Its workers
+        # start from a forkserver, never forked from a job thread while batcher
+        # threads and model inference are running
+        Visualizer(workers=None),
+        BatchedSentimentAnalyzer(SentimentAnalyzer(), batch_size * 4, batch_wait)
+    )
+    store = ArtifactStore(cache_dir) if cache_dir else None
+    spool = InputSpool(spool_dir, max_bytes=spool_max_bytes)
+    return JobManager(components, output_dir, store, max_jobs, max_queued, spool,
+                      max_finished, finished_ttl)
+
+def main():
+    # Load environment variables
+    load_dotenv()
+
+    # Parse command line arguments
+    parser = argparse.ArgumentParser(description='Smart Video Summarizer (service mode)')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on')
+    parser.add_argument('--port', type=int, default=8080, help='Port to listen on')
+    parser.add_argument('--output_dir', default='data/output', help='Root output directory; one subdirectory per job')
+    parser.add_argument('--cache_dir', default='data/cache/artifacts',
+                      help='Directory for stage artifacts reused across runs')
+    parser.add_argument('--no_cache', action='store_true', help='Recompute every stage')
+    parser.add_argument('--spool_dir', default='data/cache/inputs',
+                      help='Directory where remote inputs are downloaded once and shared by all stages')
+    parser.add_argument('--spool_max_gb', type=float, default=50,
+                      help='Size budget of the input spool; abandoned and least recently used downloads are evicted beyond it')
+    parser.add_argument('--max_jobs', type=int, default=4, help='Maximum number of jobs running at once')
+    parser.add_argument('--max_queued', type=int, default=16,
+                      help='Maximum number of waiting jobs before submissions get 503')
+    parser.add_argument('--max_finished', type=int, default=1000,
+                      help='Maximum number of finished jobs whose status and result are kept')
+    parser.add_argument('--job_ttl', type=float, default=3600,
+                      help='Seconds a finished job stays available for status and result requests')
+    parser.add_argument('--batch_size', type=int, default=8, help='Maximum summarization chunks per model batch')
+    parser.add_argument('--batch_wait_ms', type=float, default=20,
+                      help='Maximum milliseconds a request waits for its batch to fill')
+    args = parser.parse_args()
+
+    print("Loading models...")
+    ServiceHandler.manager = create_manager(args.output_dir, None if args.no_cache else args.cache_dir,
+                                            args.max_jobs, args.max_queued, args.batch_size,
+                                            args.batch_wait_ms / 1000, args.spool_dir,
+                                            args.max_finished, args.job_ttl,
+                                            int(args.spool_max_gb * 1024 ** 3))
+
+    server = ThreadingHTTPServer((args.host, args.port), ServiceHandler)
+    print(f"Listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
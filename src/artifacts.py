@@ -0,0 +1,295 @@
+import os
+import glob
+import json
+import pickle
+import shutil
+import hashlib
+import tempfile
+import numpy as np
+from typing import Any, Dict, List, Optional
+from src.audio_cache import atomic_write
+
+_SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def code_version() -> str:
+    """
+    Get a version identifier for the pipeline code.
+
+    Returns:
+        Hash of the source files under src/, so any code change
+        invalidates previously stored artifacts
+    """
+    digest = hashlib.sha256()
+    for path in sorted(glob.glob(os.path.join(_SRC_DIR, '*.py'))):
+        digest.update(os.path.basename(path).encode('utf-8'))
+        with open(path, 'rb') as source_file:
+            digest.update(source_file.read())
+    return digest.hexdigest()[:16]
+
+def _hash(*parts: str) -> str:
+    return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+class ArtifactStore:
+    def __init__(self, root: str = 'data/cache/artifacts', version: Optional[str] = None,
+                 max_bytes: int = 20 * 1024 * 1024 * 1024):
+        """
+        Content-addressed store for stage outputs.
+
+        Args:
+            root: Directory for artifacts
+            version: Code version artifacts are valid for (default: hash of src/)
+            max_bytes: Size budget; artifacts from older code versions, then
+                the least recently used ones, are evicted beyond it
+        """
+        self.root = root
+        self.version = version or code_version()
+        self.max_bytes = max_bytes
+        # Running total of stored bytes; the store is only walked on the first
+        # save and when eviction is due
+        self._size: Optional[int] = None
+        os.makedirs(self.root, exist_ok=True)
+
+    def fingerprint_input(self, path: str) -> str:
+        """
+        Fingerprint an input video by content.
+
+        The content hash is remembered per (path, size, mtime), so unchanged
+        files are only read once.
+
+        Args:
+            path: Path to a local file, or a URL
+
+        Returns:
+            Hex digest identifying the input
+        """
+        if not os.path.isfile(path):
+            # Remote inputs are identified by their location
+            return _hash('url', path)
+
+        stat = os.stat(path)
+        memo_key = _hash('memo', os.path.abspath(path), str(stat.st_size), str(stat.st_mtime_ns))
+        memo_path = os.path.join(self.root, 'fingerprints', memo_key)
+        if os.path.exists(memo_path):
+            with open(memo_path) as memo_file:
+                return memo_file.read()
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as input_file:
+            for chunk in iter(lambda: input_file.read(1 << 20), b''):
+                digest.update(chunk)
+        fingerprint = digest.hexdigest()
+
+        atomic_write(memo_path, fingerprint.encode('utf-8'))
+        return fingerprint
+
+    def value_key(self, value: Any) -> str:
+        """
+        Key a plain input value (e.g. a language code) by its representation.
+        """
+        return _hash('value', repr(value))
+
+    def stage_key(self, stage: str, config: Dict, input_keys: List[str]) -> str:
+        """
+        Build the artifact key for a stage.
+
+        Args:
+            stage: Stage name
+            config: Stage configuration that affects its outputs
+            input_keys: Keys of the stage inputs, in declaration order
+
+        Returns:
+            Hex digest combining the inputs, config and code version
+        """
+        return _hash('stage', stage, json.dumps(config, sort_keys=True, default=str), self.version, *input_keys)
+
+    def _dir(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key)
+
+    def has(self, key: str) -> bool:
+        """
+        Check whether a complete artifact exists for a key.
+        """
+        return os.path.exists(os.path.join(self._dir(key), 'manifest.json'))
+
+    def save(self, key: str, stage: str, outputs: Dict[str, Any]):
+        """
+        Persist stage outputs under a key.
+
+        Lists of equally shaped arrays (video frames) are written one array
+        at a time into a single memory-mapped .npy file, so they are never
+        copied in memory; everything else is pickled. The directory is built
+        under a temporary name and renamed into place, and the manifest is
+        what marks it valid, so interrupted writes are never loaded.
+
+        Args:
+            key: Artifact key from stage_key
+            stage: Stage name, recorded in the manifest
+            outputs: Dictionary mapping output names to values
+        """
+        target = self._dir(key)
+        if os.path.exists(target):
+            return
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+
+        work_dir = tempfile.mkdtemp(dir=os.path.dirname(target), prefix='.tmp-')
+        try:
+            formats = {}
+            for name, value in outputs.items():
+                if self._is_frame_list(value):
+                    array = np.lib.format.open_memmap(os.path.join(work_dir, f'{name}.npy'), mode='w+',
+                                                      dtype=value[0].dtype, shape=(len(value),) + value[0].shape)
+                    for index, frame in enumerate(value):
+                        array[index] = frame
+                    array.flush()
+                    del array
+                    formats[name] = 'npy'
+                else:
+                    with open(os.path.join(work_dir, f'{name}.pkl'), 'wb') as value_file:
+                        pickle.dump(value, value_file, protocol=pickle.HIGHEST_PROTOCOL)
+                    formats[name] = 'pickle'
+
+            manifest = {'stage': stage, 'version': self.version, 'outputs': formats}
+            with open(os.path.join(work_dir, 'manifest.json'), 'w') as manifest_file:
+                json.dump(manifest, manifest_file)
+
+            size = self._dir_size(work_dir)
+            os.rename(work_dir, target)
+        except OSError:
+            shutil.rmtree(work_dir, ignore_errors=True)
+            # Another process stored the same artifact first
+            if not self.has(key):
+                raise
+            return
+
+        if self._size is None:
+            self._size = self.size()
+        else:
+            self._size += size
+        if self._size > self.max_bytes:
+            self._evict()
+
+    def load(self, key: str) -> Dict[str, Any]:
+        """
+        Load stage outputs stored under a key.
+
+        Frame arrays are memory-mapped, so loading is cheap and frames are
+        only read from disk when used.
+
+        Args:
+            key: Artifact key from stage_key
+
+        Returns:
+            Dictionary mapping output names to values
+        """
+        artifact_dir = self._dir(key)
+        manifest_path = os.path.join(artifact_dir, 'manifest.json')
+        with open(manifest_path) as manifest_file:
+            manifest = json.load(manifest_file)
+        # Refresh the access time so eviction keeps recently used artifacts
+        os.utime(manifest_path, None)
+
+        outputs = {}
+        for name, fmt in manifest['outputs'].items():
+            if fmt == 'npy':
+                outputs[name] = list(np.load(os.path.join(artifact_dir, f'{name}.npy'), mmap_mode='r'))
+            else:
+                with open(os.path.join(artifact_dir, f'{name}.pkl'), 'rb') as value_file:
+                    outputs[name] = pickle.load(value_file)
+        return outputs
+
+    def discard(self, key: str):
+        """
+        Remove an artifact, e.g. one that failed to load, so it can be stored again.
+        """
+        if os.path.exists(self._dir(key)):
+            self._remove(self._dir(key))
+
+    def size(self) -> int:
+        """
+        Get the total size of all stored artifacts.
+
+        Returns:
+            Size in bytes
+        """
+        return sum(size for _, size, _, _ in self._entries())
+
+    def _entries(self) -> list:
+        """
+        List stored artifacts.
+
+        Returns:
+            List of (directory, size, last_used, stale) tuples, where stale
+            marks artifacts written by another code version
+        """
+        entries = []
+        for prefix in os.listdir(self.root):
+            prefix_dir = os.path.join(self.root, prefix)
+            # Artifacts live under two-character key prefixes; skip fingerprints and temporaries
+            if len(prefix) != 2 or not os.path.isdir(prefix_dir):
+                continue
+            for name in os.listdir(prefix_dir):
+                if name.startswith('.tmp-'):
+                    continue
+                artifact_dir = os.path.join(prefix_dir, name)
+                manifest_path = os.path.join(artifact_dir, 'manifest.json')
+                try:
+                    with open(manifest_path) as manifest_file:
+                        version = json.load(manifest_file).get('version')
+                    last_used = os.stat(manifest_path).st_mtime
+                except (OSError, ValueError):
+                    continue
+                entries.append((artifact_dir, self._dir_size(artifact_dir), last_used, version != self.version))
+        return entries
+
+    def _evict(self):
+        """
+        Remove artifacts until the store fits in max_bytes.
+
+        Artifacts from other code versions can never be loaded again and go
+        first, then the least recently used ones. Evicts down to 90% of the
+        budget so that the walk over the store is not repeated on every save.
+        """
+        entries = self._entries()
+        total = sum(size for _, size, _, _ in entries)
+        target = int(self.max_bytes * 0.9)
+
+        if total > self.max_bytes:
+            entries.sort(key=lambda x: (not x[3], x[2]))
+            for artifact_dir, size, _, _ in entries:
+                if total <= target:
+                    break
+                self._remove(artifact_dir)
+                total -= size
+
+        # Resynchronize with artifacts written by other processes sharing the store
+        self._size = total
+
+    @staticmethod
+    def _remove(artifact_dir: str):
+        # Rename first so readers never see a partially deleted artifact
+        trash_dir = tempfile.mkdtemp(dir=os.path.dirname(artifact_dir), prefix='.tmp-')
+        try:
+            os.rename(artifact_dir, os.path.join(trash_dir, 'artifact'))
+        except OSError:
+            pass
+        shutil.rmtree(trash_dir, ignore_errors=True)
+
+    @staticmethod
+    def _dir_size(path: str) -> int:
+        size = 0
+        for name in os.listdir(path):
+            try:
+                size += os.path.getsize(os.path.join(path, name))
+            except OSError:
+                pass
+        return size
+
+    @staticmethod
+    def _is_frame_list(value: Any) -> bool:
+        if not isinstance(value, list) or not value:
+            return False
+        first = value[0]
+        return all(
+            isinstance(v, np.ndarray) and v.shape == first.shape and v.dtype == first.dtype
+            for v in value
+        )
@@ -0,0 +1,182 @@
+import os
+import hashlib
+import tempfile
+import unicodedata
+from typing import Optional
+
+def atomic_write(path: str, data: bytes) -> str:
+    """
+    Write bytes to a file atomically.
+
+    The data is written to a temporary file in the destination directory
+    and then renamed over the target, so readers never see a partial file.
+
+    Args:
+        path: Destination file path
+        data: Bytes to write
+
+    Returns:
+        Path to the written file
+    """
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as tmp_file:
+            tmp_file.write(data)
+            tmp_file.flush()
+            os.fsync(tmp_file.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    return path
+
+class AudioCache:
+    def __init__(self, cache_dir: str = 'data/cache/audio', max_bytes: int = 512 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        # Running total of cached bytes; the tree is only walked on the first
+        # put and when eviction is due
+        self._size: Optional[int] = None
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """
+        Normalize text so that cosmetic differences map to the same clip.
+
+        Args:
+            text: Input text
+
+        Returns:
+            Text in NFC form with whitespace collapsed
+        """
+        return ' '.join(unicodedata.normalize('NFC', text).split())
+
+    def make_key(self, text: str, language_code: str, voice: str, audio_encoding: str) -> str:
+        """
+        Build a content-addressed key for a synthesized clip.
+
+        Args:
+            text: Text to synthesize
+            language_code: Language code for speech synthesis
+            voice: Voice identifier (name or gender)
+            audio_encoding: Audio encoding of the clip
+
+        Returns:
+            Hex digest identifying the clip
+        """
+        payload = '\x1f'.join([
+            self.normalize_text(text),
+            language_code,
+            voice,
+            audio_encoding
+        ])
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Look up a cached clip.
+
+        Args:
+            key: Clip key from make_key
+
+        Returns:
+            Clip bytes, or None if the clip is not cached
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as clip_file:
+                data = clip_file.read()
+        except FileNotFoundError:
+            return None
+
+        # Refresh the access time so eviction keeps recently used clips
+        os.utime(path, None)
+        return data
+
+    def put(self, key: str, data: bytes) -> str:
+        """
+        Store a clip in the cache and evict old clips if over budget.
+
+        Args:
+            key: Clip key from make_key
+            data: Clip bytes
+
+        Returns:
+            Path to the cached clip
+        """
+        path = self._path(key)
+        if self._size is None:
+            self._size = self.size()
+        try:
+            self._size -= os.path.getsize(path)
+        except FileNotFoundError:
+            pass
+
+        atomic_write(path, data)
+        self._size += len(data)
+        if self._size > self.max_bytes:
+            self._evict()
+        return path
+
+    def size(self) -> int:
+        """
+        Get the total size of all cached clips.
+
+        Returns:
+            Size in bytes
+        """
+        return sum(size for _, size, _ in self._entries())
+
+    def _entries(self) -> list:
+        """
+        List cached clips.
+
+        Returns:
+            List of (path, size, mtime) tuples
+        """
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.startswith('.tmp-'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _evict(self):
+        """
+        Remove least recently used clips until the cache fits in max_bytes.
+
+        Evicts down to 90% of the budget so that the walk over the cache is
+        not repeated on every following put.
+        """
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+
+        if total > self.max_bytes:
+            entries.sort(key=lambda x: x[2])
+            for path, size, _ in entries:
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+
+        # Resynchronize with clips written by other processes sharing the cache
+        self._size = total
@@ -1,16 +1,33 @@
+import io
 import os
+import re
+import hashlib
+from typing import List, Optional, Tuple
 from google.cloud import texttospeech
 from gtts import gTTS
-import ffmpeg
+from src.audio_cache import AudioCache, atomic_write
+from src.video_renderer import SegmentRenderer
+from src.profiling import measure
 
 class AudioGenerator:
-    def __init__(self):
-        self.client = texttospeech.TextToSpeechClient()
+    def __init__(self, cache_dir: str = 'data/cache/audio', max_cache_bytes: int = 512 * 1024 * 1024,
+                 client=None):
+        # A client can be injected, e.g. a local fake for benchmarks
+        self.client = client or texttospeech.TextToSpeechClient()
+        self.cache = AudioCache(cache_dir, max_cache_bytes)
+        self.renderer = SegmentRenderer()
+        self.assembler = self.renderer.assembler
+        self.voice_gender = 'NEUTRAL'
+        self.audio_encoding = 'MP3'
         
     def generate_audio(self, text: str, language_code: str, output_dir: str) -> str:
         """
         Generate audio from text using Google Cloud Text-to-Speech.
         
+        The text is synthesized sentence by sentence and every clip is stored
+        in the audio cache, so unchanged sentences are never sent to the TTS
+        service twice.
+        
         Args:
             text: Text to convert to speech
             language_code: Language code for speech synthesis
@@ -23,28 +40,24 @@ class AudioGenerator:
             # Set up the voice
             voice = texttospeech.VoiceSelectionParams(
                 language_code=language_code,
-                ssml_gender=texttospeech.SsmlVoiceGender.NEUTRAL
+                ssml_gender=getattr(texttospeech.SsmlVoiceGender, self.voice_gender)
             )
             
             # Set up the audio configuration
             audio_config = texttospeech.AudioConfig(
-                audio_encoding=texttospeech.AudioEncoding.MP3
+                audio_encoding=getattr(texttospeech.AudioEncoding, self.audio_encoding)
             )
             
-            # Generate speech
-            synthesis_input = texttospeech.SynthesisInput(text=text)
-            response = self.client.synthesize_speech(
-                input=synthesis_input,
-                voice=voice,
-                audio_config=audio_config
-            )
+            def synthesize(sentence: str) -> bytes:
+                synthesis_input = texttospeech.SynthesisInput(text=sentence)
+                response = self.client.synthesize_speech(
+                    input=synthesis_input,
+                    voice=voice,
+                    audio_config=audio_config
+                )
+                return response.audio_content
             
-            # Save the audio file
-            output_path = os.path.join(output_dir, 'summary.mp3')
-            with open(output_path, 'wb') as out:
-                out.write(response.audio_content)
-                
-            return output_path
+            return self._generate_cached(text, language_code, self.voice_gender, synthesize, output_dir)
             
         except Exception as e:
             # Fallback to gTTS if Google Cloud fails
@@ -63,57 +76,92 @@ class AudioGenerator:
             Path to the generated audio file
         """
         try:
-            # Create gTTS object
-            tts = gTTS(text=text, lang=language_code[:2])
+            def synthesize(sentence: str) -> bytes:
+                # Create gTTS object
+                tts = gTTS(text=sentence, lang=language_code[:2])
+                buffer = io.BytesIO()
+                tts.write_to_fp(buffer)
+                return buffer.getvalue()
             
-            # Save the audio file
-            output_path = os.path.join(output_dir, 'summary.mp3')
-            tts.save(output_path)
-            
-            return output_path
+            return self._generate_cached(text, language_code, 'gtts', synthesize, output_dir)
             
         except Exception as e:
             raise Exception(f"Error generating audio with gTTS: {str(e)}")
             
-    def create_video_summary(self, video_path: str, summary_audio_path: str, output_dir: str) -> str:
+    def _generate_cached(self, text: str, language_code: str, voice: str, synthesize, output_dir: str) -> str:
+        """
+        Assemble an audio file from per-sentence clips, synthesizing only cache misses.
+        
+        Args:
+            text: Text to convert to speech
+            language_code: Language code for speech synthesis
+            voice: Voice identifier used in the cache key
+            synthesize: Callable mapping a sentence to encoded audio bytes
+            output_dir: Directory to save the audio file
+            
+        Returns:
+            Path to the generated audio file
+        """
+        clips = []
+        keys = []
+        for sentence in self._split_sentences(text):
+            key = self.cache.make_key(sentence, language_code, voice, self.audio_encoding)
+            clip = self.cache.get(key)
+            if clip is None:
+                with measure(f'tts.{voice}', 'external', sentences=1):
+                    clip = synthesize(sentence)
+                self.cache.put(key, clip)
+            clips.append(clip)
+            keys.append(key)
+        
+        # MP3 streams can be joined frame-wise, so the clips are simply concatenated.
+        # The file name is derived from the clip keys so jobs sharing an output
+        # directory never overwrite each other.
+        digest = hashlib.sha256(''.join(keys).encode('utf-8')).hexdigest()[:16]
+        output_path = os.path.join(output_dir, f'summary_{digest}.mp3')
+        return atomic_write(output_path, b''.join(clips))
+            
+    def _split_sentences(self, text: str) -> List[str]:
         """
-        Create a video summary by combining key frames with audio.
+        Split text into sentences for per-sentence synthesis.
+        
+        Args:
+            text: Input text
+            
+        Returns:
+            List of non-empty sentences
+        """
+        sentences = re.split(r'(?<=[.!?])\s+', AudioCache.normalize_text(text))
+        return [s for s in sentences if s]
+            
+    def create_video_summary(self, video_path: str, summary_audio_path: str, output_dir: str,
+                             segments: Optional[List[Tuple[float, float]]] = None, speed_factor: float = 1.0) -> str:
+        """
+        Create a video summary by combining selected segments with audio.
+        
+        Segments are cut on keyframes and stream copied where possible, so
+        rendering time grows with the summary length rather than the source.
         
         Args:
             video_path: Path to the original video
             summary_audio_path: Path to the summary audio
             output_dir: Directory to save the output video
+            segments: List of (start_time, end_time) tuples to keep; if
+                omitted, evenly spaced clips matching the narration length are used
+            speed_factor: Speed adjustment factor for the summary audio
             
         Returns:
             Path to the generated video summary
         """
         try:
-            output_path = os.path.join(output_dir, 'summary.mp4')
-            
-            # Get video information
-            probe = ffmpeg.probe(video_path)
-            video_info = next(s for s in probe['streams'] if s['codec_type'] == 'video')
-            
-            # Create video stream from key frames
-            video_stream = ffmpeg.input(video_path)
-            
-            # Create audio stream from summary
-            audio_stream = ffmpeg.input(summary_audio_path)
-            
-            # Combine video and audio
-            stream = ffmpeg.output(
-                video_stream,
-                audio_stream,
-                output_path,
-                vcodec='libx264',
-                acodec='aac',
-                strict='experimental'
-            )
-            
-            # Run ffmpeg
-            ffmpeg.run(stream, overwrite_output=True)
+            # Name the video after its inputs, so jobs sharing an output
+            # directory never overwrite each other
+            digest = hashlib.sha256(repr((
+                os.path.abspath(video_path), summary_audio_path, segments or [], speed_factor
+            )).encode('utf-8')).hexdigest()[:16]
+            output_path = os.path.join(output_dir, f'summary_{digest}.mp4')
             
-            return output_path
+            return self.renderer.render(video_path, segments or [], output_path, summary_audio_path, speed_factor)
             
         except Exception as e:
             raise Exception(f"Error creating video summary: {str(e)}")
@@ -122,6 +170,11 @@ class AudioGenerator:
         """
         Adjust the speed of an audio file.
         
+        Factors outside atempo's 0.5-2.0 range are handled with a chain of
+        atempo filters, and the result is loudness normalized in the same pass.
+        When a video summary is rendered, pass speed_factor to
+        create_video_summary instead to avoid this extra ffmpeg run.
+        
         Args:
             audio_path: Path to the audio file
             speed_factor: Speed adjustment factor (e.g., 1.5 for 50% faster)
@@ -131,20 +184,12 @@ class AudioGenerator:
             Path to the modified audio file
         """
         try:
-            output_path = os.path.join(output_dir, 'adjusted_audio.mp3')
-            
-            # Adjust audio speed using ffmpeg
-            stream = ffmpeg.input(audio_path)
-            stream = ffmpeg.output(
-                stream,
-                output_path,
-                af=f'atempo={speed_factor}'
-            )
-            
-            # Run ffmpeg
-            ffmpeg.run(stream, overwrite_output=True)
+            # Name the output after its inputs, so jobs sharing an output
+            # directory never overwrite each other
+            digest = hashlib.sha256(repr((os.path.abspath(audio_path), speed_factor)).encode('utf-8')).hexdigest()[:16]
+            output_path = os.path.join(output_dir, f'adjusted_{digest}.mp3')
             
-            return output_path
+            return self.assembler.assemble_audio(audio_path, output_path, speed_factor)
             
         except Exception as e:
-            raise Exception(f"Error adjusting audio speed: {str(e)}") 
\ No newline at end of file
+            raise Exception(f"Error adjusting audio speed: {str(e)}")
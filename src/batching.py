@@ -0,0 +1,135 @@
+import time
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional
+
+class QueueFullError(Exception):
+    pass
+
+class MicroBatcher:
+    def __init__(self, batch_fn: Callable[[List[Any]], List[Any]], max_batch_size: int = 16,
+                 max_wait: float = 0.02, max_queue: int = 1024, name: str = 'batcher'):
+        """
+        Combine items submitted from many threads into shared batches.
+
+        A background thread takes the first waiting item, then keeps
+        collecting until the batch is full or max_wait has passed since that
+        item arrived, and runs batch_fn on the whole batch. If the batch
+        fails, its items are retried one at a time so that only the items
+        that fail on their own get the exception.
+
+        Args:
+            batch_fn: Callable mapping a list of items to a list of results
+                of the same length
+            max_batch_size: Maximum number of items per batch
+            max_wait: Maximum seconds the oldest item waits for a batch to fill
+            max_queue: Maximum number of waiting items before submit applies
+                backpressure
+            name: Name of the background thread
+        """
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._closed = False
+        self._thread = threading.Thread(target=self._loop, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, item: Any, block: bool = True, timeout: Optional[float] = None) -> Future:
+        """
+        Queue an item for the next batch.
+
+        Args:
+            item: Item passed to batch_fn
+            block: Wait for space when the queue is full
+            timeout: Maximum seconds to wait for space
+
+        Returns:
+            Future resolving to the item's result
+
+        Raises:
+            QueueFullError: If the queue stays full
+        """
+        if self._closed:
+            raise RuntimeError("Batcher is closed")
+        future = Future()
+        try:
+            self._queue.put((item, future), block=block, timeout=timeout)
+        except queue.Full:
+            raise QueueFullError("Batch queue is full")
+        return future
+
+    def map(self, items: List[Any]) -> List[Any]:
+        """
+        Submit several items and wait for all of their results.
+
+        Args:
+            items: Items passed to batch_fn
+
+        Returns:
+            List of results in item order
+        """
+        futures = [self.submit(item) for item in items]
+        return [future.result() for future in futures]
+
+    def pending(self) -> int:
+        """
+        Get the number of items waiting for a batch.
+        """
+        return self._queue.qsize()
+
+    def close(self):
+        """
+        Stop the background thread after the queued items are processed.
+        """
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+
+    def _loop(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+
+            batch = [first]
+            deadline = time.monotonic() + self.max_wait
+            stop = False
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    entry = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if entry is None:
+                    stop = True
+                    break
+                batch.append(entry)
+
+            self._run(batch)
+            if stop:
+                return
+
+    def _run(self, batch: List[tuple]):
+        try:
+            results = self._call([item for item, _ in batch])
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+                return
+            # One bad item must not fail the unrelated requests batched with it
+            for entry in batch:
+                self._run([entry])
+            return
+
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+    def _call(self, items: List[Any]) -> List[Any]:
+        results = self.batch_fn(items)
+        if len(results) != len(items):
+            raise ValueError(f"Batch function returned {len(results)} results for {len(items)} items")
+        return results
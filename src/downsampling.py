@@ -0,0 +1,101 @@
+import numpy as np
+from typing import Tuple
+
+def minmax_downsample(x: np.ndarray, y: np.ndarray, n_out: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Downsample a series by keeping the minimum and maximum of each bucket.
+
+    This preserves peaks and troughs, so line plots of the reduced series
+    look the same as plots of the raw series at screen resolution.
+
+    Args:
+        x: X values, sorted ascending
+        y: Y values
+        n_out: Target number of points
+
+    Returns:
+        Tuple of downsampled (x, y) arrays
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if n_out <= 0 or len(x) <= n_out:
+        return x, y
+
+    n_buckets = max(1, n_out // 2)
+    edges = np.linspace(0, len(x), n_buckets + 1).astype(int)
+
+    indices = []
+    for start, end in zip(edges[:-1], edges[1:]):
+        if end <= start:
+            continue
+        bucket = y[start:end]
+        lo = start + int(np.argmin(bucket))
+        hi = start + int(np.argmax(bucket))
+        indices.extend(sorted({lo, hi}))
+
+    indices = np.array(indices)
+    return x[indices], y[indices]
+
+def lttb_downsample(x: np.ndarray, y: np.ndarray, n_out: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Downsample a series with the Largest-Triangle-Three-Buckets algorithm.
+
+    Args:
+        x: X values, sorted ascending
+        y: Y values
+        n_out: Target number of points (at least 3)
+
+    Returns:
+        Tuple of downsampled (x, y) arrays
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if n_out < 3 or len(x) <= n_out:
+        return x, y
+
+    # The first and last points are always kept; the rest are split into buckets
+    edges = np.linspace(1, len(x) - 1, n_out - 1).astype(int)
+
+    indices = [0]
+    prev = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+
+        # Average of the next bucket (or the last point for the final bucket)
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], edges[i + 2]
+        else:
+            next_start, next_end = len(x) - 1, len(x)
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        # Pick the point forming the largest triangle with the previous pick and the average
+        areas = np.abs(
+            (x[prev] - avg_x) * (y[start:end] - y[prev])
+            - (x[prev] - x[start:end]) * (avg_y - y[prev])
+        )
+        prev = start + int(np.argmax(areas))
+        indices.append(prev)
+
+    indices.append(len(x) - 1)
+    indices = np.array(indices)
+    return x[indices], y[indices]
+
+def downsample(x: np.ndarray, y: np.ndarray, n_out: int, method: str = 'lttb') -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Downsample a series for plotting.
+
+    Args:
+        x: X values, sorted ascending
+        y: Y values
+        n_out: Target number of points
+        method: 'lttb' or 'minmax'
+
+    Returns:
+        Tuple of downsampled (x, y) arrays
+    """
+    if method == 'lttb':
+        return lttb_downsample(x, y, n_out)
+    if method == 'minmax':
+        return minmax_downsample(x, y, n_out)
+    raise ValueError(f"Unknown downsampling method: {method}")
@@ -0,0 +1,390 @@
+import os
+import json
+import time
+import fcntl
+import shutil
+import hashlib
+import http.client
+import urllib.error
+import urllib.request
+from urllib.parse import urlparse
+from typing import Dict, List, Optional, Tuple
+from src.audio_cache import atomic_write
+from src.profiling import measure
+
+def is_remote(path: str) -> bool:
+    """
+    Check whether an input refers to a remote HTTP(S) resource.
+    """
+    return urlparse(path).scheme in ('http', 'https')
+
+class InputSpool:
+    def __init__(self, spool_dir: str = 'data/cache/inputs', chunk_size: int = 8 * 1024 * 1024,
+                 timeout: float = 60.0, max_retries: int = 5, revalidate: bool = True,
+                 max_bytes: int = 50 * 1024 * 1024 * 1024, partial_ttl: float = 7 * 24 * 3600):
+        """
+        Local content-addressed store for remote inputs.
+
+        Every stage reads the spooled copy, so a remote video is downloaded
+        once per job instead of once per ffmpeg/OpenCV open.
+
+        Args:
+            spool_dir: Directory for downloads
+            chunk_size: Bytes per range request
+            timeout: Socket timeout in seconds
+            max_retries: Consecutive failed requests tolerated before giving up
+            revalidate: Check with a conditional request that a spooled URL
+                is unchanged before reusing it. URLs served without an ETag
+                or Last-Modified header are treated as immutable
+            max_bytes: Size budget; abandoned partial downloads, then
+                objects no URL refers to anymore, then the least recently
+                used objects are evicted when it is exceeded
+            partial_ttl: Seconds after its last write that an unlocked
+                partial download counts as abandoned
+        """
+        self.spool_dir = spool_dir
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.revalidate = revalidate
+        self.max_bytes = max_bytes
+        self.partial_ttl = partial_ttl
+        # Running total of spooled bytes; the spool is only walked on the
+        # first download and when eviction is due
+        self._size: Optional[int] = None
+        for sub in ('objects', 'partial', 'urls'):
+            os.makedirs(os.path.join(self.spool_dir, sub), exist_ok=True)
+
+    def resolve(self, path: str) -> str:
+        """
+        Get a local path for an input, downloading remote inputs once.
+
+        Args:
+            path: Local file path or HTTP(S) URL
+
+        Returns:
+            Local file path
+        """
+        return self.fetch(path) if is_remote(path) else path
+
+    def fetch(self, url: str) -> str:
+        """
+        Download a URL into the spool, resuming an interrupted download.
+
+        Args:
+            url: HTTP(S) URL
+
+        Returns:
+            Path to the spooled file, named by the SHA-256 of its content
+        """
+        try:
+            url_key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+            index_path = os.path.join(self.spool_dir, 'urls', f'{url_key}.json')
+
+            # Already spooled
+            index = self._read_json(index_path)
+            if index and os.path.exists(index['path']) and self._is_current(url, index):
+                self._touch(index['path'])
+                return index['path']
+
+            partial_path = os.path.join(self.spool_dir, 'partial', url_key)
+            meta_path = partial_path + '.json'
+
+            # Jobs fetching the same URL wait for the first download instead of repeating it
+            with open(partial_path + '.lock', 'w') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+                # Another job may have finished the download while we waited
+                fresh = self._read_json(index_path)
+                if fresh and fresh != index and os.path.exists(fresh['path']):
+                    self._touch(fresh['path'])
+                    return fresh['path']
+
+                if self._size is None:
+                    self._size = self.size()
+                # Bytes of an interrupted download, already part of the running total
+                resumed = os.path.getsize(partial_path) if os.path.exists(partial_path) else 0
+
+                meta = self._read_json(meta_path) or {}
+                with measure('ingest.download', 'external') as record:
+                    downloaded, meta = self._download(url, partial_path, meta_path, meta)
+                    record.add(bytes_downloaded=downloaded)
+
+                # Content address the finished download
+                digest = hashlib.sha256()
+                with open(partial_path, 'rb') as partial_file:
+                    for chunk in iter(lambda: partial_file.read(1 << 20), b''):
+                        digest.update(chunk)
+                extension = os.path.splitext(urlparse(url).path)[1][:8]
+                object_path = os.path.join(self.spool_dir, 'objects', digest.hexdigest() + extension)
+
+                if os.path.exists(object_path):
+                    os.remove(partial_path)
+                    self._touch(object_path)
+                else:
+                    os.replace(partial_path, object_path)
+                    self._size += os.path.getsize(object_path)
+                self._size -= resumed
+                if os.path.exists(meta_path):
+                    os.remove(meta_path)
+
+                index = {
+                    'url': url,
+                    'path': object_path,
+                    'etag': meta.get('etag'),
+                    'last_modified': meta.get('last_modified')
+                }
+                atomic_write(index_path, json.dumps(index).encode('utf-8'))
+
+            if self._size > self.max_bytes:
+                self._evict(keep=object_path)
+            return object_path
+
+        except Exception as e:
+            raise Exception(f"Error fetching input {url}: {str(e)}")
+
+    def size(self) -> int:
+        """
+        Get the total size of spooled objects and partial downloads.
+
+        Returns:
+            Size in bytes
+        """
+        return sum(size for _, size, _ in self._files('objects') + self._files('partial'))
+
+    def _files(self, sub: str) -> List[Tuple[str, int, float]]:
+        """
+        List the files of a spool subdirectory.
+
+        Returns:
+            List of (path, size, mtime) tuples
+        """
+        entries = []
+        directory = os.path.join(self.spool_dir, sub)
+        for name in os.listdir(directory):
+            if name.startswith('.tmp-') or name.endswith('.lock'):
+                continue
+            path = os.path.join(directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _evict(self, keep: Optional[str] = None):
+        """
+        Remove spooled files until the spool fits in max_bytes.
+
+        Abandoned partial downloads go first, then objects that no URL
+        refers to anymore (superseded by a changed resource), then the least
+        recently used objects. Evicts down to 90% of the budget so that the
+        walk over the spool is not repeated on every download.
+
+        Args:
+            keep: Object that must stay, e.g. the one just fetched
+        """
+        objects = self._files('objects')
+        partials = self._files('partial')
+        total = sum(size for _, size, _ in objects + partials)
+        target = int(self.max_bytes * 0.9)
+
+        if total > self.max_bytes:
+            # Partial downloads with their metadata, grouped by URL
+            partial_sizes = {}
+            partial_mtimes = {}
+            for path, size, mtime in partials:
+                base = path[:-len('.json')] if path.endswith('.json') else path
+                partial_sizes[base] = partial_sizes.get(base, 0) + size
+                partial_mtimes[base] = max(partial_mtimes.get(base, 0), mtime)
+            now = time.time()
+            for base, mtime in sorted(partial_mtimes.items(), key=lambda x: x[1]):
+                if total <= target:
+                    break
+                if now - mtime > self.partial_ttl and self._remove_partial(base):
+                    total -= partial_sizes[base]
+
+            # URL index entries by the object they point to
+            referrers = {}
+            for name in os.listdir(os.path.join(self.spool_dir, 'urls')):
+                index_path = os.path.join(self.spool_dir, 'urls', name)
+                index = self._read_json(index_path) if name.endswith('.json') else None
+                if index:
+                    referrers.setdefault(index.get('path'), []).append(index_path)
+
+            objects.sort(key=lambda x: (x[0] in referrers, x[2]))
+            for path, size, _ in objects:
+                if total <= target:
+                    break
+                if path == keep:
+                    continue
+                # Drop the index entries first so no job is handed a missing path
+                for index_path in referrers.get(path, []):
+                    try:
+                        os.remove(index_path)
+                    except FileNotFoundError:
+                        pass
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+
+        # Resynchronize with downloads made by other processes sharing the spool
+        self._size = total
+
+    @staticmethod
+    def _remove_partial(partial_path: str) -> bool:
+        """
+        Remove a partial download unless a job is currently writing it.
+
+        Returns:
+            Whether the partial download was removed
+        """
+        # The lock file itself stays: deleting it could let two jobs lock
+        # different files for the same URL
+        with open(partial_path + '.lock', 'a') as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False
+            for path in (partial_path, partial_path + '.json'):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+        return True
+
+    @staticmethod
+    def _touch(path: str):
+        # Refresh the modification time so eviction keeps recently used objects
+        try:
+            os.utime(path, None)
+        except FileNotFoundError:
+            pass
+
+    def _is_current(self, url: str, index: Dict) -> bool:
+        """
+        Check whether a spooled URL still matches the remote resource.
+
+        Sends a conditional request for the first byte; 304 means unchanged.
+        If the server cannot be reached, the spooled copy is used.
+        """
+        if not self.revalidate or not (index.get('etag') or index.get('last_modified')):
+            return True
+
+        headers = {'Range': 'bytes=0-0'}
+        if index.get('etag'):
+            headers['If-None-Match'] = index['etag']
+        if index.get('last_modified'):
+            headers['If-Modified-Since'] = index['last_modified']
+
+        try:
+            request = urllib.request.Request(url, headers=headers)
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                # A server ignoring the conditions may still report the same validator
+                etag = response.headers.get('ETag')
+                return etag is not None and etag == index.get('etag')
+        except urllib.error.HTTPError as e:
+            return e.code == 304
+        except (urllib.error.URLError, http.client.HTTPException, OSError):
+            print(f"Could not revalidate {url}; using the spooled copy")
+            return True
+
+    def _download(self, url: str, partial_path: str, meta_path: str, meta: Dict) -> Tuple[int, Dict]:
+        """
+        Fill the partial file with range requests until it is complete.
+
+        Returns:
+            Number of bytes transferred by this call, and the resource
+            metadata (etag, last_modified, size)
+        """
+        offset = os.path.getsize(partial_path) if os.path.exists(partial_path) else 0
+        total = meta.get('size')
+        transferred = 0
+        failures = 0
+
+        while total is None or offset < total:
+            requested = self.chunk_size
+            headers = {'Range': f'bytes={offset}-{offset + requested - 1}'}
+            # Only resume if the resource is unchanged since the partial download began
+            validator = meta.get('etag') or meta.get('last_modified')
+            if offset and validator:
+                headers['If-Range'] = validator
+
+            try:
+                request = urllib.request.Request(url, headers=headers)
+                with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                    etag = response.headers.get('ETag')
+                    if response.status == 206 and offset and meta.get('etag') and etag and etag != meta['etag']:
+                        # The server ignored If-Range and the resource changed: never splice
+                        # bytes of two versions, start over instead
+                        os.remove(partial_path)
+                        offset, total, meta = 0, None, {}
+                        continue
+
+                    if response.status == 206:
+                        start, total = self._parse_content_range(response.headers.get('Content-Range'))
+                        if start != offset:
+                            raise ValueError(f"Server returned range starting at {start}, expected {offset}")
+                        mode = 'ab'
+                    else:
+                        # No range support, or the resource changed: start over with the full body
+                        offset = 0
+                        length = response.headers.get('Content-Length')
+                        total = int(length) if length is not None else None
+                        mode = 'wb'
+
+                    if offset == 0 or not validator:
+                        meta = {
+                            'etag': etag,
+                            'last_modified': response.headers.get('Last-Modified'),
+                            'size': total
+                        }
+                        atomic_write(meta_path, json.dumps(meta).encode('utf-8'))
+
+                    with open(partial_path, mode) as partial_file:
+                        shutil.copyfileobj(response, partial_file, 1 << 20)
+                        partial_file.flush()
+                        written = partial_file.tell() - offset
+
+                    offset += written
+                    transferred += written
+                    failures = 0
+
+                    if total is None:
+                        # A full body is the whole file; with ranges of unknown total
+                        # size, a reply shorter than requested is the last one
+                        if response.status != 206 or written < requested:
+                            break
+
+            except urllib.error.HTTPError as e:
+                if e.code == 416 and total is None and offset > 0:
+                    # Requested range starts at the end: the file is complete
+                    break
+                raise
+            except (urllib.error.URLError, http.client.HTTPException, OSError):
+                failures += 1
+                if failures > self.max_retries:
+                    raise
+                # Resume from whatever made it to disk
+                offset = os.path.getsize(partial_path) if os.path.exists(partial_path) else 0
+
+        return transferred, meta
+
+    @staticmethod
+    def _parse_content_range(value: Optional[str]):
+        # Format: "bytes start-end/total"
+        if not value or not value.startswith('bytes '):
+            raise ValueError(f"Invalid Content-Range: {value}")
+        span, total = value[6:].split('/')
+        start = int(span.split('-')[0])
+        return start, (None if total == '*' else int(total))
+
+    @staticmethod
+    def _read_json(path: str) -> Optional[Dict]:
+        try:
+            with open(path) as json_file:
+                return json.load(json_file)
+        except (FileNotFoundError, ValueError):
+            return None
@@ -0,0 +1,134 @@
+from typing import List, Optional, Tuple
+import ffmpeg
+from src.profiling import measure
+
+def atempo_factors(speed_factor: float) -> List[float]:
+    """
+    Split a tempo change into a chain of atempo factors.
+
+    A single atempo filter only accepts factors between 0.5 and 2.0, so
+    larger changes are expressed as a product of in-range factors.
+
+    Args:
+        speed_factor: Overall speed adjustment factor
+
+    Returns:
+        List of factors, each between 0.5 and 2.0, whose product is speed_factor
+    """
+    if speed_factor <= 0:
+        raise ValueError(f"Speed factor must be positive, got {speed_factor}")
+
+    factors = []
+    while speed_factor > 2.0:
+        factors.append(2.0)
+        speed_factor /= 2.0
+    while speed_factor < 0.5:
+        factors.append(0.5)
+        speed_factor /= 0.5
+    if speed_factor != 1.0 or not factors:
+        factors.append(speed_factor)
+    return factors
+
+class MediaAssembler:
+    def __init__(self, target_loudness: float = -16.0, true_peak: float = -1.5, loudness_range: float = 11.0,
+                 normalize: bool = True, sample_rate: int = 48000):
+        # EBU R128 loudness normalization targets
+        self.target_loudness = target_loudness
+        self.true_peak = true_peak
+        self.loudness_range = loudness_range
+        self.normalize = normalize
+        # Single-pass loudnorm upsamples to 192 kHz; resample its output back
+        self.sample_rate = sample_rate
+
+    def process_narration(self, stream, speed_factor: float = 1.0):
+        """
+        Apply the tempo change and loudness normalization to an audio stream.
+
+        Args:
+            stream: ffmpeg audio stream
+            speed_factor: Speed adjustment factor (e.g., 1.5 for 50% faster)
+
+        Returns:
+            Filtered ffmpeg audio stream
+        """
+        if speed_factor != 1.0:
+            for factor in atempo_factors(speed_factor):
+                stream = stream.filter('atempo', factor)
+        if self.normalize:
+            stream = stream.filter('loudnorm', I=self.target_loudness, TP=self.true_peak, LRA=self.loudness_range)
+            stream = stream.filter('aresample', self.sample_rate)
+        return stream
+
+    def assemble(self, video_path: str, narration_path: Optional[str], output_path: str,
+                 segments: Optional[List[Tuple[float, float]]] = None, speed_factor: float = 1.0) -> str:
+        """
+        Assemble the final summary video in a single ffmpeg process.
+
+        Each selected segment is read through its own seeking input, so only
+        the kept ranges are decoded. One filter graph concatenates them,
+        applies the tempo change and loudness normalization to the narration
+        and muxes the result, without writing intermediate files.
+
+        Args:
+            video_path: Path to the source video
+            narration_path: Path to the narration audio, or None for a silent video
+            output_path: Path of the assembled video
+            segments: List of (start_time, end_time) tuples to keep; the whole
+                video is used if omitted
+            speed_factor: Speed adjustment factor for the narration
+
+        Returns:
+            Path to the assembled video
+        """
+        try:
+            if segments:
+                # Input-side seeking jumps to each range instead of decoding
+                # the source from the start
+                parts = [
+                    ffmpeg.input(video_path, ss=start, t=end - start).video.setpts('PTS-STARTPTS')
+                    for start, end in segments
+                ]
+                video = parts[0] if len(parts) == 1 else ffmpeg.concat(*parts, v=1, a=0)
+            else:
+                video = ffmpeg.input(video_path).video
+
+            streams = [video]
+            if narration_path:
+                streams.append(self.process_narration(ffmpeg.input(narration_path).audio, speed_factor))
+
+            stream = ffmpeg.output(
+                *streams,
+                output_path,
+                vcodec='libx264',
+                acodec='aac'
+            )
+            with measure('ffmpeg.assemble', 'external'):
+                ffmpeg.run(stream, overwrite_output=True, quiet=True)
+
+            return output_path
+
+        except Exception as e:
+            raise Exception(f"Error assembling media: {str(e)}")
+
+    def assemble_audio(self, audio_path: str, output_path: str, speed_factor: float = 1.0) -> str:
+        """
+        Apply the tempo change and loudness normalization to an audio file.
+
+        Args:
+            audio_path: Path to the audio file
+            output_path: Path of the processed audio
+            speed_factor: Speed adjustment factor (e.g., 1.5 for 50% faster)
+
+        Returns:
+            Path to the processed audio file
+        """
+        try:
+            audio = self.process_narration(ffmpeg.input(audio_path).audio, speed_factor)
+            stream = ffmpeg.output(audio, output_path)
+            with measure('ffmpeg.assemble_audio', 'external'):
+                ffmpeg.run(stream, overwrite_output=True, quiet=True)
+
+            return output_path
+
+        except Exception as e:
+            raise Exception(f"Error assembling audio: {str(e)}")
@@ -0,0 +1,280 @@
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, wait
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from src import profiling
+
+class PipelineError(Exception):
+    def __init__(self, stage: str, error: BaseException):
+        super().__init__(f"Stage '{stage}' failed: {str(error)}")
+        self.stage = stage
+        self.error = error
+
+class Stage:
+    def __init__(self, name: str, func: Callable, inputs: Sequence[str] = (), outputs: Sequence[str] = (),
+                 kind: str = 'thread', cache: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            name: Unique stage name
+            func: Callable receiving the inputs as keyword arguments. It
+                returns a single value for one output, a tuple for several
+                outputs, or anything (ignored) for none
+            inputs: Names of the values the stage consumes
+            outputs: Names of the values the stage produces
+            kind: 'thread' for I/O-bound work such as cloud calls, 'process'
+                for CPU-bound work (func and its inputs must be picklable),
+                or 'inline' to run on the scheduling thread
+            cache: Configuration that affects the stage outputs. Stages with
+                a cache config have their outputs stored as artifacts and
+                reused when inputs, config and code are unchanged
+        """
+        if kind not in ('thread', 'process', 'inline'):
+            raise ValueError(f"Unknown stage kind: {kind}")
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.kind = kind
+        self.cache = cache
+
+    def unpack(self, result: Any) -> Dict[str, Any]:
+        """
+        Map a stage result onto its declared outputs.
+
+        Args:
+            result: Return value of the stage function
+
+        Returns:
+            Dictionary mapping output names to values
+        """
+        if not self.outputs:
+            return {}
+        if len(self.outputs) == 1:
+            return {self.outputs[0]: result}
+        if not isinstance(result, tuple) or len(result) != len(self.outputs):
+            raise ValueError(f"Stage '{self.name}' must return a tuple of {len(self.outputs)} values")
+        return dict(zip(self.outputs, result))
+
+class Pipeline:
+    def __init__(self, max_threads: int = 4, max_processes: Optional[int] = None, store=None):
+        """
+        Args:
+            max_threads: Maximum number of thread stages running at once
+            max_processes: Maximum number of process stages running at once
+            store: Optional ArtifactStore used by stages with a cache config
+        """
+        self.max_threads = max_threads
+        self.max_processes = max_processes
+        self.store = store
+        self.stages: List[Stage] = []
+
+    def add_stage(self, name: str, func: Callable, inputs: Sequence[str] = (), outputs: Sequence[str] = (),
+                  kind: str = 'thread', cache: Optional[Dict[str, Any]] = None) -> 'Pipeline':
+        """
+        Declare a stage.
+
+        Args:
+            name: Unique stage name
+            func: Stage function (see Stage)
+            inputs: Names of the values the stage consumes
+            outputs: Names of the values the stage produces
+            kind: 'thread', 'process' or 'inline'
+            cache: Configuration that affects the stage outputs, or None to
+                always run the stage
+
+        Returns:
+            The pipeline, for chaining
+        """
+        if any(stage.name == name for stage in self.stages):
+            raise ValueError(f"Duplicate stage name: {name}")
+        self.stages.append(Stage(name, func, inputs, outputs, kind, cache))
+        return self
+
+    def validate(self, initial: Sequence[str] = ()):
+        """
+        Check that every input has exactly one producer and the graph is acyclic.
+
+        Args:
+            initial: Names of the values supplied to run()
+
+        Raises:
+            ValueError: If the stage graph is invalid
+        """
+        producers = {name: None for name in initial}
+        for stage in self.stages:
+            for output in stage.outputs:
+                if output in producers:
+                    raise ValueError(f"Value '{output}' is produced more than once")
+                producers[output] = stage.name
+
+        for stage in self.stages:
+            missing = [name for name in stage.inputs if name not in producers]
+            if missing:
+                raise ValueError(f"Stage '{stage.name}' has no producer for: {', '.join(missing)}")
+
+        # Kahn's algorithm: every stage must become ready eventually
+        available = set(initial)
+        remaining = list(self.stages)
+        while remaining:
+            ready = [s for s in remaining if all(name in available for name in s.inputs)]
+            if not ready:
+                raise ValueError(f"Cycle between stages: {', '.join(s.name for s in remaining)}")
+            for stage in ready:
+                available.update(stage.outputs)
+                remaining.remove(stage)
+
+    def run(self, initial: Optional[Dict[str, Any]] = None,
+            initial_keys: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """
+        Run all stages, starting each one as soon as its inputs are available.
+
+        Independent stages run concurrently, so total latency follows the
+        critical path of the graph. If a stage fails, no further stages are
+        started, stages that have not begun are cancelled and the failure is
+        raised once running stages finish.
+
+        When the pipeline has an artifact store, every value gets a key
+        derived from the keys of the inputs that produced it. Cached stages
+        whose key already has a stored artifact are loaded instead of run,
+        so a rerun only computes stages that are missing or invalid; a stage
+        whose artifact cannot be loaded (corrupt, or evicted meanwhile) is run.
+
+        Args:
+            initial: Values available before any stage runs
+            initial_keys: Optional keys for initial values that should not be
+                keyed by their representation (e.g. an input fingerprint)
+
+        Returns:
+            Dictionary of all initial and produced values
+
+        Raises:
+            PipelineError: If a stage raises
+        """
+        values = dict(initial or {})
+        self.validate(values.keys())
+
+        keys = {}
+        if self.store is not None:
+            keys = {name: self.store.value_key(value) for name, value in values.items()}
+            keys.update(initial_keys or {})
+
+        pending = list(self.stages)
+        running = {}
+        thread_pool = ThreadPoolExecutor(max_workers=self.max_threads)
+        process_pool = None
+        saves = []
+        failure = None
+        # Stages whose artifact failed to load; they are computed instead
+        uncached = set()
+
+        try:
+            while pending or running:
+                # Start every stage whose inputs are ready
+                if failure is None:
+                    for stage in [s for s in pending if all(name in values for name in s.inputs)]:
+                        pending.remove(stage)
+                        kwargs = {name: values[name] for name in stage.inputs}
+                        stage_key = self._stage_key(stage, keys)
+
+                        if (stage_key is not None and stage.cache is not None and stage.name not in uncached
+                                and self.store.has(stage_key)):
+                            future = thread_pool.submit(self._load_artifact, stage, stage_key)
+                            running[future] = (stage, stage_key, True, time.perf_counter())
+                            continue
+
+                        if stage.kind == 'inline':
+                            try:
+                                self._store_outputs(stage, stage_key, stage.unpack(self._call(stage, kwargs)),
+                                                    values, keys, thread_pool, saves)
+                            except Exception as e:
+                                failure = PipelineError(stage.name, e)
+                                break
+                            continue
+
+                        if stage.kind == 'process':
+                            if process_pool is None:
+                                process_pool = ProcessPoolExecutor(max_workers=self.max_processes)
+                            future = process_pool.submit(stage.func, **kwargs)
+                        else:
+                            future = thread_pool.submit(self._call, stage, kwargs)
+                        running[future] = (stage, stage_key, False, time.perf_counter())
+
+                if failure is not None:
+                    for future in running:
+                        future.cancel()
+                    pending = []
+                    if not running:
+                        break
+                elif not running:
+                    # Inline stages may have made more stages ready
+                    continue
+
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, stage_key, from_cache, started = running.pop(future)
+                    if future.cancelled():
+                        continue
+
+                    # Process stages cannot report to the profiler themselves
+                    profiler = profiling.get_profiler()
+                    if profiler is not None and stage.kind == 'process' and not from_cache:
+                        profiler.record(stage.name, 'stage', time.perf_counter() - started)
+
+                    if from_cache and future.exception() is not None:
+                        print(f"Warning: could not load cached '{stage.name}' outputs, recomputing: "
+                              f"{str(future.exception())}")
+                        uncached.add(stage.name)
+                        self.store.discard(stage_key)
+                        pending.append(stage)
+                        continue
+
+                    try:
+                        outputs = future.result() if from_cache else stage.unpack(future.result())
+                        self._store_outputs(stage, stage_key, outputs, values, keys,
+                                            thread_pool, None if from_cache else saves)
+                    except Exception as e:
+                        if failure is None:
+                            failure = PipelineError(stage.name, e)
+
+            # Artifacts are persisted in the background; make sure they land
+            for future in saves:
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"Warning: could not store artifact: {str(e)}")
+
+        finally:
+            thread_pool.shutdown(wait=True, cancel_futures=True)
+            if process_pool is not None:
+                process_pool.shutdown(wait=True, cancel_futures=True)
+
+        if failure is not None:
+            raise failure from failure.error
+
+        return values
+
+    @staticmethod
+    def _call(stage: Stage, kwargs: Dict[str, Any]) -> Any:
+        with profiling.measure(stage.name, 'stage'):
+            return stage.func(**kwargs)
+
+    def _load_artifact(self, stage: Stage, stage_key: str) -> Dict[str, Any]:
+        with profiling.measure(stage.name, 'stage', cached=1):
+            return self.store.load(stage_key)
+
+    def _stage_key(self, stage: Stage, keys: Dict[str, str]) -> Optional[str]:
+        if self.store is None:
+            return None
+        return self.store.stage_key(stage.name, stage.cache or {}, [keys[name] for name in stage.inputs])
+
+    def _store_outputs(self, stage: Stage, stage_key: Optional[str], outputs: Dict[str, Any],
+                       values: Dict[str, Any], keys: Dict[str, str], thread_pool, saves: Optional[list]):
+        """
+        Record stage outputs and their keys, and persist them if the stage is cached.
+        """
+        values.update(outputs)
+        if stage_key is None:
+            return
+        for name in outputs:
+            keys[name] = self.store.value_key((stage_key, name))
+        if stage.cache is not None and saves is not None:
+            saves.append(thread_pool.submit(self.store.save, stage_key, stage.name, outputs))
@@ -0,0 +1,298 @@
+import os
+import sys
+import json
+import time
+import pstats
+import cProfile
+import resource
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+# Profiler receiving measurements from instrumented code; None when profiling is off
+_active = None
+
+def rss_mb() -> float:
+    """
+    Current resident set size of this process in MB.
+
+    /proc is Linux-only, so the lifetime peak is returned elsewhere.
+    """
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except OSError:
+        return peak_rss_mb()['self']
+
+def peak_rss_mb() -> Dict[str, float]:
+    """
+    Lifetime peak RSS in MB of this process ('self') and of its largest
+    waited-for child process ('children').
+    """
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    scale = 1024 * 1024 if os.uname().sysname == 'Darwin' else 1024
+    return {
+        'self': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale,
+        'children': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale
+    }
+
+def _process_cpu() -> float:
+    usage_self = resource.getrusage(resource.RUSAGE_SELF)
+    usage_children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return (usage_self.ru_utime + usage_self.ru_stime
+            + usage_children.ru_utime + usage_children.ru_stime)
+
+class _NullRecord:
+    enabled = False
+
+    def add(self, **counters):
+        pass
+
+class Record:
+    enabled = True
+
+    def __init__(self, name: str, category: str):
+        self.name = name
+        self.category = category
+        self.thread = threading.current_thread().name
+        self.counters: Dict[str, float] = {}
+        self.result: Dict[str, Any] = {}
+        self.rss_start = self.rss_peak = rss_mb()
+
+    def add(self, **counters):
+        """
+        Add to the item counters of this measurement.
+
+        Common counters are frames, audio_seconds, tokens, sentences and
+        bytes_decoded; rates per second are derived for all of them.
+        """
+        for key, value in counters.items():
+            self.counters[key] = self.counters.get(key, 0) + value
+
+class Profiler:
+    def __init__(self, cprofile: bool = False, sample_interval: float = 0.02):
+        """
+        Args:
+            cprofile: Also collect cProfile statistics for every stage
+            sample_interval: Seconds between RSS samples taken while
+                measurements are open
+        """
+        self.cprofile = cprofile
+        self.sample_interval = sample_interval
+        self.records = []
+        self._stats = None
+        self._lock = threading.Lock()
+        self._open = set()
+        self._sampler = None
+        self._origin = time.perf_counter()
+        self._started_at = time.time()
+
+        # From Python 3.12 cProfile hooks the process-wide sys.monitoring slot:
+        # one profiler sees every thread, and a second concurrent one cannot be
+        # enabled. Earlier versions profile per thread, so each stage gets its own
+        self._run_profile = None
+        if cprofile and sys.version_info >= (3, 12):
+            self._run_profile = cProfile.Profile()
+            self._run_profile.enable()
+
+    @contextmanager
+    def measure(self, name: str, category: str = 'call', **counters):
+        """
+        Measure a block of code.
+
+        Args:
+            name: Name of the stage or call
+            category: 'stage', 'model' or 'external'
+            counters: Initial item counters
+
+        Yields:
+            Record to which the block can add item counters
+        """
+        record = Record(name, category)
+        record.add(**counters)
+        self._track(record)
+
+        profile = None
+        if self.cprofile and self._run_profile is None and category == 'stage':
+            profile = cProfile.Profile()
+            profile.enable()
+
+        start = time.perf_counter()
+        thread_cpu = time.thread_time()
+        process_cpu = _process_cpu()
+        error = None
+        try:
+            yield record
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            wall = time.perf_counter() - start
+            if profile is not None:
+                profile.disable()
+            rss_end = self._untrack(record)
+
+            record.result = {
+                'name': name,
+                'category': category,
+                'thread': record.thread,
+                'start': start - self._origin,
+                'wall_time': wall,
+                # CPU time of the measuring thread, and of the whole process
+                # (including ffmpeg children) which overlaps with concurrent stages
+                'cpu_time': time.thread_time() - thread_cpu,
+                'process_cpu_time': _process_cpu() - process_cpu,
+                # Process RSS sampled during the block; concurrent stages share it
+                'rss_mb': {
+                    'start': record.rss_start,
+                    'peak': record.rss_peak,
+                    'end': rss_end,
+                    'delta': rss_end - record.rss_start,
+                    'peak_delta': record.rss_peak - record.rss_start
+                },
+                'counters': dict(record.counters),
+                'per_second': {key: value / wall for key, value in record.counters.items() if wall > 0},
+                'error': str(error) if error is not None else None
+            }
+            with self._lock:
+                self.records.append(record.result)
+                if profile is not None:
+                    if self._stats is None:
+                        self._stats = pstats.Stats(profile)
+                    else:
+                        self._stats.add(profile)
+
+    def _track(self, record: Record):
+        """
+        Include a record in RSS sampling, starting the sampler thread if needed.
+        """
+        with self._lock:
+            self._open.add(record)
+            if self._sampler is None:
+                self._sampler = threading.Thread(target=self._sample, name='rss-sampler', daemon=True)
+                self._sampler.start()
+
+    def _untrack(self, record: Record) -> float:
+        """
+        Stop sampling for a record.
+
+        Returns:
+            Current RSS in MB, also folded into the record's peak
+        """
+        rss = rss_mb()
+        with self._lock:
+            self._open.discard(record)
+            record.rss_peak = max(record.rss_peak, rss)
+        return rss
+
+    def _sample(self):
+        # One thread samples for all open records; blocks shorter than the
+        # interval still get their start and end readings
+        while True:
+            time.sleep(self.sample_interval)
+            rss = rss_mb()
+            with self._lock:
+                for record in self._open:
+                    if rss > record.rss_peak:
+                        record.rss_peak = rss
+
+    def record(self, name: str, category: str, wall_time: float, **counters):
+        """
+        Add a measurement taken elsewhere (e.g. a stage run in another process).
+        """
+        with self._lock:
+            self.records.append({
+                'name': name,
+                'category': category,
+                'thread': None,
+                'start': None,
+                'wall_time': wall_time,
+                'cpu_time': None,
+                'process_cpu_time': None,
+                'rss_mb': None,
+                'counters': counters,
+                'per_second': {key: value / wall_time for key, value in counters.items() if wall_time > 0},
+                'error': None
+            })
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Build the profiling report.
+
+        Returns:
+            Dictionary with the run totals, every measurement and per-name aggregates
+        """
+        with self._lock:
+            records = list(self.records)
+
+        totals = {}
+        for r in records:
+            total = totals.setdefault(r['name'], {'category': r['category'], 'count': 0,
+                                                  'wall_time': 0.0, 'counters': {}})
+            total['count'] += 1
+            total['wall_time'] += r['wall_time']
+            for key, value in r['counters'].items():
+                total['counters'][key] = total['counters'].get(key, 0) + value
+
+        return {
+            'started_at': self._started_at,
+            'wall_time': time.perf_counter() - self._origin,
+            'cpu_time': time.process_time(),
+            'peak_rss_mb': peak_rss_mb(),
+            'records': records,
+            'totals': totals
+        }
+
+    def write(self, path: str, cprofile_path: Optional[str] = None) -> str:
+        """
+        Write the JSON report and, if collected, the cProfile statistics.
+
+        Args:
+            path: Path of the JSON report
+            cprofile_path: Path of the .prof dump (viewable with snakeviz or
+                convertible to a flamegraph with flameprof)
+
+        Returns:
+            Path to the JSON report
+        """
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w') as report_file:
+            json.dump(self.report(), report_file, indent=2)
+
+        if self._run_profile is not None:
+            self._run_profile.disable()
+            with self._lock:
+                self._stats = pstats.Stats(self._run_profile)
+            self._run_profile = None
+
+        if cprofile_path and self._stats is not None:
+            self._stats.dump_stats(cprofile_path)
+
+        return path
+
+def enable(profiler: Optional[Profiler]):
+    """
+    Make a profiler receive measurements from instrumented code.
+
+    Args:
+        profiler: Profiler to activate, or None to disable profiling
+    """
+    global _active
+    _active = profiler
+
+def get_profiler() -> Optional[Profiler]:
+    return _active
+
+@contextmanager
+def measure(name: str, category: str = 'call', **counters):
+    """
+    Measure a block with the active profiler; a no-op when profiling is off.
+
+    Yields:
+        Record to which the block can add item counters
+    """
+    if _active is None:
+        yield _NullRecord()
+    else:
+        with _active.measure(name, category, **counters) as record:
+            yield record
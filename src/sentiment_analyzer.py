@@ -1,18 +1,23 @@
 from transformers import pipeline
-from typing import Dict, List
+from typing import Callable, Dict, List, Optional
 import numpy as np
+from src.profiling import measure
 
 class SentimentAnalyzer:
     def __init__(self):
         # Initialize the sentiment analysis pipeline
-        self.analyzer = pipeline("sentiment-analysis", model="distilbert-base-uncased-finetuned-sst-2-english")
+        self.model_name = "distilbert-base-uncased-finetuned-sst-2-english"
+        self.analyzer = pipeline("sentiment-analysis", model=self.model_name)
         
-    def analyze(self, text: str) -> Dict[str, float]:
+    def analyze(self, text: str,
+                score_sentences: Optional[Callable[[List[str]], List[float]]] = None) -> Dict[str, float]:
         """
         Analyze sentiment of the input text.
         
         Args:
             text: Input text to analyze
+            score_sentences: Optional replacement for score_sentences, e.g.
+                to batch across requests
             
         Returns:
             Dictionary containing sentiment scores
@@ -22,19 +27,36 @@ class SentimentAnalyzer:
             sentences = self._split_into_sentences(text)
             
             # Analyze sentiment for each sentence
-            sentiment_scores = {}
-            for i, sentence in enumerate(sentences):
-                result = self.analyzer(sentence)[0]
-                # Convert label to score (-1 to 1)
-                score = 1 if result['label'] == 'POSITIVE' else -1
-                score *= result['score']  # Weight by confidence
-                sentiment_scores[i] = score
-                
-            return sentiment_scores
+            scores = (score_sentences or self.score_sentences)(sentences)
+            return dict(enumerate(scores))
             
         except Exception as e:
             raise Exception(f"Error analyzing sentiment: {str(e)}")
             
+    def score_sentences(self, sentences: List[str]) -> List[float]:
+        """
+        Score several sentences in one batched model call.
+        
+        Args:
+            sentences: Sentences to score
+            
+        Returns:
+            List of scores from -1 to 1, one per sentence
+        """
+        if not sentences:
+            return []
+        
+        with measure('distilbert.sentiment', 'model', sentences=len(sentences)):
+            results = self.analyzer(sentences, batch_size=min(len(sentences), 32))
+        
+        scores = []
+        for result in results:
+            # Convert label to score (-1 to 1)
+            score = 1 if result['label'] == 'POSITIVE' else -1
+            score *= result['score']  # Weight by confidence
+            scores.append(score)
+        return scores
+            
     def _split_into_sentences(self, text: str) -> List[str]:
         """
         Split text into sentences.
@@ -1,13 +1,16 @@
 from transformers import pipeline
-from typing import List, Dict
+from typing import Callable, List, Dict, Optional
 import numpy as np
+from src.profiling import measure
 
 class VideoSummarizer:
     def __init__(self):
         # Initialize the summarization pipeline
-        self.summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
+        self.model_name = "facebook/bart-large-cnn"
+        self.summarizer = pipeline("summarization", model=self.model_name)
         
-    def summarize(self, text: str, max_length: int = 150, min_length: int = 30) -> str:
+    def summarize(self, text: str, max_length: int = 150, min_length: int = 30,
+                  summarize_chunks: Optional[Callable[[List[str]], List[str]]] = None) -> str:
         """
         Generate a summary from the input text.
         
@@ -15,38 +18,57 @@ class VideoSummarizer:
             text: Input text to summarize
             max_length: Maximum length of the summary
             min_length: Minimum length of the summary
+            summarize_chunks: Optional replacement for summarize_chunks with
+                the lengths already bound, e.g. to batch across requests
             
         Returns:
             Generated summary
         """
         try:
+            if summarize_chunks is None:
+                summarize_chunks = lambda chunks: self.summarize_chunks(chunks, max_length, min_length)
+            
             # Split text into chunks if it's too long
             chunks = self._split_text(text)
             
-            # Summarize each chunk
-            summaries = []
-            for chunk in chunks:
-                summary = self.summarizer(chunk, 
-                                        max_length=max_length,
-                                        min_length=min_length,
-                                        do_sample=False)
-                summaries.append(summary[0]['summary_text'])
-            
-            # Combine summaries
-            final_summary = ' '.join(summaries)
+            # Summarize the chunks and combine the summaries
+            final_summary = ' '.join(summarize_chunks(chunks))
             
             # If the combined summary is too long, summarize it again
             if len(final_summary.split()) > max_length:
-                final_summary = self.summarizer(final_summary,
-                                             max_length=max_length,
-                                             min_length=min_length,
-                                             do_sample=False)[0]['summary_text']
+                final_summary = summarize_chunks([final_summary])[0]
             
             return final_summary
             
         except Exception as e:
             raise Exception(f"Error generating summary: {str(e)}")
             
+    def summarize_chunks(self, chunks: List[str], max_length: int = 150, min_length: int = 30) -> List[str]:
+        """
+        Summarize several chunks in one batched model call.
+        
+        Args:
+            chunks: Texts short enough for the model
+            max_length: Maximum length of each summary
+            min_length: Minimum length of each summary
+            
+        Returns:
+            List of summaries, one per chunk
+        """
+        if not chunks:
+            return []
+        
+        with measure('bart.summarize', 'model') as record:
+            results = self.summarizer(chunks,
+                                      max_length=max_length,
+                                      min_length=min_length,
+                                      do_sample=False,
+                                      batch_size=min(len(chunks), 8))
+            if record.enabled:
+                record.add(tokens=sum(len(self.summarizer.tokenizer.encode(chunk)) for chunk in chunks))
+        
+        return [result['summary_text'] for result in results]
+            
     def _split_text(self, text: str, max_chunk_length: int = 1024) -> List[str]:
         """
         Split text into chunks of maximum length.
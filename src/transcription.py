@@ -1,12 +1,13 @@
-import os
 from google.cloud import speech
 from google.cloud.speech import enums
 from google.cloud.speech import types
 import ffmpeg
+from src.profiling import measure
 
 class TranscriptionService:
-    def __init__(self):
-        self.client = speech.SpeechClient()
+    def __init__(self, client=None):
+        # A client can be injected, e.g. a local fake for benchmarks
+        self.client = client or speech.SpeechClient()
         
     def transcribe(self, video_path: str, language_code: str = 'en-US') -> str:
         """
@@ -21,11 +22,7 @@ class TranscriptionService:
         """
         try:
             # Extract audio from video
-            audio_path = self._extract_audio(video_path)
-            
-            # Read audio file
-            with open(audio_path, 'rb') as audio_file:
-                content = audio_file.read()
+            content = self._extract_audio(video_path)
             
             # Configure audio
             audio = types.RecognitionAudio(content=content)
@@ -38,40 +35,42 @@ class TranscriptionService:
             )
             
             # Perform transcription
-            response = self.client.recognize(config=config, audio=audio)
+            with measure('speech.recognize', 'external', audio_seconds=len(content) / 32000):
+                response = self.client.recognize(config=config, audio=audio)
             
             # Combine transcriptions
             transcript = ''
             for result in response.results:
                 transcript += result.alternatives[0].transcript + ' '
             
-            # Clean up temporary audio file
-            os.remove(audio_path)
-            
             return transcript.strip()
             
         except Exception as e:
             raise Exception(f"Error transcribing audio: {str(e)}")
             
-    def _extract_audio(self, video_path: str) -> str:
+    def _extract_audio(self, video_path: str) -> bytes:
         """
         Extract audio from video file using ffmpeg.
         
+        The audio is decoded to raw 16 kHz mono PCM and read from ffmpeg's
+        stdout, so no temporary file is written next to the input.
+        
         Args:
             video_path: Path to the video file
             
         Returns:
-            Path to the extracted audio file
+            Raw LINEAR16 audio content
         """
-        audio_path = video_path.rsplit('.', 1)[0] + '.wav'
-        
         try:
             # Extract audio using ffmpeg
             stream = ffmpeg.input(video_path)
-            stream = ffmpeg.output(stream, audio_path, acodec='pcm_s16le', ac=1, ar='16k')
-            ffmpeg.run(stream, overwrite_output=True)
+            stream = ffmpeg.output(stream.audio, 'pipe:', format='s16le', acodec='pcm_s16le', ac=1, ar='16k')
+            with measure('ffmpeg.extract_audio', 'external') as record:
+                content, _ = ffmpeg.run(stream, capture_stdout=True, capture_stderr=True)
+                # 16-bit mono samples at 16 kHz
+                record.add(bytes_decoded=len(content), audio_seconds=len(content) / 32000)
             
-            return audio_path
+            return content
             
         except Exception as e:
             raise Exception(f"Error extracting audio: {str(e)}")
@@ -89,11 +88,7 @@ class TranscriptionService:
         """
         try:
             # Extract audio from video
-            audio_path = self._extract_audio(video_path)
-            
-            # Read audio file
-            with open(audio_path, 'rb') as audio_file:
-                content = audio_file.read()
+            content = self._extract_audio(video_path)
             
             # Configure audio
             audio = types.RecognitionAudio(content=content)
@@ -105,7 +100,8 @@ class TranscriptionService:
             )
             
             # Perform transcription
-            response = self.client.recognize(config=config, audio=audio)
+            with measure('speech.recognize', 'external', audio_seconds=len(content) / 32000):
+                response = self.client.recognize(config=config, audio=audio)
             
             # Extract word timestamps
             word_timestamps = []
@@ -116,9 +112,6 @@ class TranscriptionService:
                     end_time = word_info.end_time.seconds + word_info.end_time.nanos * 1e-9
                     word_timestamps.append((word, start_time, end_time))
             
-            # Clean up temporary audio file
-            os.remove(audio_path)
-            
             return word_timestamps
             
         except Exception as e:
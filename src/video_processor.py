@@ -1,11 +1,13 @@
 import cv2
 import numpy as np
-from typing import List, Tuple
+from typing import Dict, Iterator, List, Tuple
 import ffmpeg
+from src.profiling import measure
 
 class VideoProcessor:
     def __init__(self):
         self.frame_interval = 1  # Extract 1 frame per second
+        self.scene_threshold = 0.5  # Histogram correlation below which a scene changes
         
     def process_video(self, video_path: str) -> List[np.ndarray]:
         """
@@ -17,36 +19,106 @@ class VideoProcessor:
         Returns:
             List of extracted frames
         """
-        try:
-            # Get video information
-            probe = ffmpeg.probe(video_path)
-            video_info = next(s for s in probe['streams'] if s['codec_type'] == 'video')
-            fps = eval(video_info['r_frame_rate'])
-            
-            # Open video
-            cap = cv2.VideoCapture(video_path)
-            if not cap.isOpened():
-                raise ValueError(f"Could not open video: {video_path}")
+        return self.sample_video(video_path)[0]
+        
+    def sample_video(self, video_path: str) -> Tuple[List[np.ndarray], List[float]]:
+        """
+        Extract frames at regular intervals together with their timestamps.
+        
+        A frame is kept every int(fps * frame_interval) frames, so at
+        fractional frame rates (e.g. 29.97) the samples drift away from
+        index * frame_interval; the returned times are the real positions.
+        
+        Args:
+            video_path: Path to the video file or URL
             
+        Returns:
+            Tuple of (frames, times), times in seconds from the start
+        """
+        try:
             frames = []
-            frame_count = 0
+            times = []
+            for time, frame in self._iter_samples(video_path):
+                frames.append(frame)
+                times.append(time)
+            return frames, times
             
-            while True:
-                ret, frame = cap.read()
-                if not ret:
-                    break
-                    
-                # Extract frame at regular intervals
-                if frame_count % int(fps * self.frame_interval) == 0:
-                    frames.append(frame)
-                    
-                frame_count += 1
+        except Exception as e:
+            raise Exception(f"Error processing video: {str(e)}")
             
-            cap.release()
-            return frames
+    def analyze_video(self, video_path: str) -> Dict:
+        """
+        Compute compact per-sample features without keeping the frames.
+        
+        The features are all that visualization and segment selection
+        need, and are small enough to store and reuse across runs.
+        
+        Args:
+            video_path: Path to the video file or URL
+            
+        Returns:
+            Dictionary with times, brightness and contrast per sampled
+            frame, and scene_times (timestamps of the scene changes)
+        """
+        try:
+            times, brightness, contrast, scene_times = [], [], [], []
+            prev_hist = None
+            for time, frame in self._iter_samples(video_path):
+                times.append(time)
+                brightness.append(float(np.mean(frame)))
+                contrast.append(float(np.std(frame)))
+                
+                hist = self._histogram(frame)
+                if prev_hist is not None and cv2.compareHist(prev_hist, hist, cv2.HISTCMP_CORREL) < self.scene_threshold:
+                    scene_times.append(time)
+                prev_hist = hist
+                
+            return {
+                'times': np.array(times, dtype=float),
+                'brightness': np.array(brightness, dtype=float),
+                'contrast': np.array(contrast, dtype=float),
+                'scene_times': scene_times
+            }
             
         except Exception as e:
-            raise Exception(f"Error processing video: {str(e)}")
+            raise Exception(f"Error analyzing video: {str(e)}")
+            
+    def _iter_samples(self, video_path: str) -> Iterator[Tuple[float, np.ndarray]]:
+        """
+        Decode a video and yield (time, frame) every frame_interval seconds.
+        """
+        # Get video information
+        with measure('ffmpeg.probe', 'external'):
+            probe = ffmpeg.probe(video_path)
+        video_info = next(s for s in probe['streams'] if s['codec_type'] == 'video')
+        fps = eval(video_info['r_frame_rate'])
+        
+        # Open video
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise ValueError(f"Could not open video: {video_path}")
+        
+        step = max(1, int(fps * self.frame_interval))
+        frame_count = 0
+        bytes_decoded = 0
+        
+        try:
+            with measure('opencv.decode', 'external') as record:
+                while True:
+                    ret, frame = cap.read()
+                    if not ret:
+                        break
+                        
+                    # Extract frame at regular intervals
+                    if frame_count % step == 0:
+                        yield frame_count / fps, frame
+                        
+                    frame_count += 1
+                    bytes_decoded += frame.nbytes
+                
+                record.add(frames=frame_count, bytes_decoded=bytes_decoded)
+        finally:
+            cap.release()
             
     def extract_key_frames(self, frames: List[np.ndarray], threshold: float = 0.5) -> List[np.ndarray]:
         """
@@ -85,20 +157,22 @@ class VideoProcessor:
         prev_hist = None
         
         for i, frame in enumerate(frames):
-            # Convert frame to grayscale
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            
-            # Calculate histogram
-            hist = cv2.calcHist([gray], [0], None, [256], [0, 256])
-            hist = cv2.normalize(hist, hist).flatten()
+            hist = self._histogram(frame)
             
             if prev_hist is not None:
                 # Calculate histogram difference
                 diff = cv2.compareHist(prev_hist, hist, cv2.HISTCMP_CORREL)
                 
-                if diff < 0.5:  # Threshold for scene change
+                if diff < self.scene_threshold:
                     scene_changes.append(i)
                     
             prev_hist = hist
             
-        return scene_changes 
\ No newline at end of file
+        return scene_changes
+        
+    @staticmethod
+    def _histogram(frame: np.ndarray) -> np.ndarray:
+        # Normalized grayscale histogram used to compare consecutive samples
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        hist = cv2.calcHist([gray], [0], None, [256], [0, 256])
+        return cv2.normalize(hist, hist).flatten() 
\ No newline at end of file
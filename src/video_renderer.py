@@ -0,0 +1,302 @@
+import os
+import bisect
+import tempfile
+from typing import List, Optional, Tuple
+import ffmpeg
+from src.media_assembler import MediaAssembler
+from src.profiling import measure
+
+# ffprobe H.264 profile names and the libx264 profile that produces them
+X264_PROFILES = {
+    'Constrained Baseline': 'baseline',
+    'Baseline': 'baseline',
+    'Main': 'main',
+    'High': 'high',
+    'High 10': 'high10',
+    'High 4:2:2': 'high422',
+    'High 4:4:4 Predictive': 'high444'
+}
+
+class SegmentRenderer:
+    def __init__(self, min_copy_duration: float = 1.0, keyframe_window: float = 10.0,
+                 clip_length: float = 5.0, default_summary_length: float = 60.0):
+        # Stretches shorter than this between keyframes are re-encoded instead
+        # of stream copied, since the extra concat entries cost more than they save
+        self.min_copy_duration = min_copy_duration
+        # Seconds probed for keyframes after each segment start and before each end
+        self.keyframe_window = keyframe_window
+        # Clip length and total summary length used when no segments are selected
+        # (e.g. no scene changes in a static lecture) and there is no narration to fit
+        self.clip_length = clip_length
+        self.default_summary_length = default_summary_length
+        self.assembler = MediaAssembler()
+
+    def render(self, video_path: str, segments: List[Tuple[float, float]], output_path: str,
+               audio_path: Optional[str] = None, speed_factor: float = 1.0) -> str:
+        """
+        Render selected time ranges of a video into a single summary video.
+
+        Each range is cut on keyframes: the GOPs fully inside the range are
+        stream copied and only the partial GOPs at its boundaries are
+        re-encoded. The parts are joined with the concat demuxer and the
+        narration (if given) is tempo adjusted, loudness normalized and muxed
+        in as the audio track by the same ffmpeg process.
+
+        Args:
+            video_path: Path to the source video
+            segments: List of (start_time, end_time) tuples in seconds; if
+                empty, evenly spaced clips covering the narration length are used
+            output_path: Path of the rendered video
+            audio_path: Optional narration audio to use as the soundtrack
+            speed_factor: Speed adjustment factor for the narration
+
+        Returns:
+            Path to the rendered video
+        """
+        try:
+            probe = ffmpeg.probe(video_path)
+            video_info = next(s for s in probe['streams'] if s['codec_type'] == 'video')
+            duration = float(probe['format']['duration'])
+
+            if not segments:
+                segments = self.even_segments(duration, self._summary_length(audio_path, speed_factor),
+                                              self.clip_length)
+            segments = self.merge_segments(segments, duration)
+            if not segments:
+                raise ValueError("No segments to render")
+
+            # Boundary GOPs can only be spliced with copied GOPs when we can
+            # re-encode to the source codec, profile and level; otherwise
+            # re-encode everything in a single filter graph
+            if video_info.get('codec_name') != 'h264' or self._encoder_profile(video_info) is None:
+                return self.assembler.assemble(video_path, audio_path, output_path, segments, speed_factor)
+            keyframes = self._keyframe_times(video_path, segments)
+
+            with tempfile.TemporaryDirectory() as work_dir:
+                parts = []
+                for start, end in segments:
+                    for part_start, part_end, copy in self._plan_segment(start, end, keyframes):
+                        part_path = os.path.join(work_dir, f'part_{len(parts):05d}.ts')
+                        if copy:
+                            self._copy_part(video_path, part_start, part_end, part_path)
+                        else:
+                            self._encode_part(video_path, video_info, part_start, part_end, part_path)
+                        parts.append(part_path)
+
+                list_path = os.path.join(work_dir, 'parts.txt')
+                with open(list_path, 'w') as list_file:
+                    for part_path in parts:
+                        list_file.write(f"file '{part_path}'\n")
+
+                self._concat(list_path, audio_path, output_path, speed_factor)
+
+            return output_path
+
+        except Exception as e:
+            raise Exception(f"Error rendering segments: {str(e)}")
+
+    @staticmethod
+    def merge_segments(segments: List[Tuple[float, float]], duration: float) -> List[Tuple[float, float]]:
+        """
+        Clamp segments to the video duration, sort them and merge overlaps.
+
+        Args:
+            segments: List of (start_time, end_time) tuples in seconds
+            duration: Duration of the source video in seconds
+
+        Returns:
+            Sorted list of non-overlapping segments
+        """
+        merged = []
+        for start, end in sorted(segments):
+            start, end = max(0.0, start), min(duration, end)
+            if end <= start:
+                continue
+            if merged and start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((start, end))
+        return merged
+
+    @staticmethod
+    def segments_from_scene_changes(scene_times: List[float], duration: Optional[float] = None,
+                                    clip_length: float = 5.0) -> List[Tuple[float, float]]:
+        """
+        Turn scene change times into time ranges starting at each change.
+
+        Args:
+            scene_times: Timestamps of the sampled frames where scenes change
+            duration: Duration of the source video in seconds; render()
+                clamps to the probed duration if omitted
+            clip_length: Length of the clip taken at each scene change
+
+        Returns:
+            Sorted list of non-overlapping segments
+        """
+        segments = [(t, t + clip_length) for t in scene_times]
+        return SegmentRenderer.merge_segments(segments, float('inf') if duration is None else duration)
+
+    @staticmethod
+    def even_segments(duration: float, total_length: float, clip_length: float = 5.0) -> List[Tuple[float, float]]:
+        """
+        Spread clips evenly over a video, adding up to about total_length.
+
+        Args:
+            duration: Duration of the source video in seconds
+            total_length: Target length of the summary in seconds
+            clip_length: Length of each clip
+
+        Returns:
+            Sorted list of non-overlapping segments
+        """
+        if total_length >= duration:
+            return [(0.0, duration)]
+        count = max(1, round(total_length / clip_length))
+        spacing = duration / count
+        segments = []
+        for index in range(count):
+            center = (index + 0.5) * spacing
+            segments.append((max(0.0, center - clip_length / 2), min(duration, center + clip_length / 2)))
+        return SegmentRenderer.merge_segments(segments, duration)
+
+    def _summary_length(self, audio_path: Optional[str], speed_factor: float) -> float:
+        """
+        Get the length the video summary should have: the narration's
+        duration after the tempo change, or default_summary_length.
+        """
+        if not audio_path:
+            return self.default_summary_length
+        with measure('ffmpeg.probe', 'external'):
+            probe = ffmpeg.probe(audio_path)
+        return float(probe['format']['duration']) / speed_factor
+
+    def _keyframe_times(self, video_path: str, segments: List[Tuple[float, float]]) -> List[float]:
+        """
+        Get keyframe times near the segment boundaries in the first video stream.
+
+        Only packets within keyframe_window after each segment start and
+        before each segment end are read, and keyframes are taken from the
+        packet flags, so nothing is decoded and the cost does not grow with
+        the length of the source. Keyframes between the windows are not
+        needed: the stretch between the found ones is stream copied whole.
+
+        Args:
+            video_path: Path to the source video
+            segments: Sorted list of (start_time, end_time) tuples in seconds
+
+        Returns:
+            Sorted list of keyframe times in seconds
+        """
+        intervals = []
+        for start, end in segments:
+            intervals.append(f'{start:.3f}%+{self.keyframe_window:.3f}')
+            intervals.append(f'{max(start, end - self.keyframe_window):.3f}%{end:.3f}')
+
+        with measure('ffprobe.keyframes', 'external'):
+            probe = ffmpeg.probe(video_path, select_streams='v:0', read_intervals=','.join(intervals),
+                                 show_entries='packet=pts_time,flags')
+        times = set()
+        for packet in probe.get('packets', []):
+            if 'K' in packet.get('flags', '') and packet.get('pts_time', 'N/A') != 'N/A':
+                times.add(float(packet['pts_time']))
+        return sorted(times)
+
+    @staticmethod
+    def _encoder_profile(video_info: dict) -> Optional[Tuple[str, str]]:
+        """
+        Get the libx264 profile and level matching the source stream.
+
+        Returns:
+            (profile, level) tuple, or None if libx264 cannot match the source
+        """
+        profile = X264_PROFILES.get(video_info.get('profile'))
+        level = video_info.get('level')
+        if profile is None or not isinstance(level, int) or level <= 0:
+            return None
+        return profile, f'{level / 10:.1f}'
+
+    def _plan_segment(self, start: float, end: float, keyframes: List[float]) -> List[Tuple[float, float, bool]]:
+        """
+        Split a segment into re-encoded boundary parts and a stream copied middle.
+
+        Args:
+            start: Segment start time in seconds
+            end: Segment end time in seconds
+            keyframes: Sorted keyframe times
+
+        Returns:
+            List of (start_time, end_time, copy) tuples
+        """
+        # First keyframe at or after start, last keyframe at or before end
+        first = bisect.bisect_left(keyframes, start)
+        last = bisect.bisect_right(keyframes, end) - 1
+
+        if first >= len(keyframes) or last < first or keyframes[last] - keyframes[first] < self.min_copy_duration:
+            return [(start, end, False)]
+
+        copy_start, copy_end = keyframes[first], keyframes[last]
+        plan = []
+        if copy_start > start:
+            plan.append((start, copy_start, False))
+        plan.append((copy_start, copy_end, True))
+        if end > copy_end:
+            plan.append((copy_end, end, False))
+        return plan
+
+    def _copy_part(self, video_path: str, start: float, end: float, output_path: str):
+        """
+        Stream copy a keyframe-aligned part of the video.
+        """
+        stream = ffmpeg.input(video_path, ss=start)
+        stream = ffmpeg.output(
+            stream.video,
+            output_path,
+            t=end - start,
+            vcodec='copy',
+            f='mpegts'
+        )
+        with measure('ffmpeg.copy_segment', 'external'):
+            ffmpeg.run(stream, overwrite_output=True, quiet=True)
+
+    def _encode_part(self, video_path: str, video_info: dict, start: float, end: float, output_path: str):
+        """
+        Re-encode a part of the video with parameters matching the source stream.
+
+        Profile, level, frame size and pixel format follow the source so the
+        part's SPS/PPS are compatible with the stream copied parts it is
+        spliced between.
+        """
+        profile, level = self._encoder_profile(video_info)
+        stream = ffmpeg.input(video_path, ss=start)
+        stream = ffmpeg.output(
+            stream.video,
+            output_path,
+            t=end - start,
+            vcodec='libx264',
+            **{'profile:v': profile, 'level:v': level},
+            s=f"{video_info['width']}x{video_info['height']}",
+            pix_fmt=video_info.get('pix_fmt', 'yuv420p'),
+            r=video_info['r_frame_rate'],
+            f='mpegts'
+        )
+        with measure('ffmpeg.encode_segment', 'external'):
+            ffmpeg.run(stream, overwrite_output=True, quiet=True)
+
+    def _concat(self, list_path: str, audio_path: Optional[str], output_path: str, speed_factor: float = 1.0):
+        """
+        Join the rendered parts with the concat demuxer and mux in the narration.
+        """
+        video_stream = ffmpeg.input(list_path, f='concat', safe=0)
+        if audio_path:
+            audio_stream = self.assembler.process_narration(ffmpeg.input(audio_path).audio, speed_factor)
+            stream = ffmpeg.output(
+                video_stream.video,
+                audio_stream,
+                output_path,
+                vcodec='copy',
+                acodec='aac'
+            )
+        else:
+            stream = ffmpeg.output(video_stream.video, output_path, vcodec='copy')
+        with measure('ffmpeg.concat', 'external'):
+            ffmpeg.run(stream, overwrite_output=True, quiet=True)
@@ -1,176 +1,342 @@
-import matplotlib.pyplot as plt
+import matplotlib
+matplotlib.use('Agg')
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 import seaborn as sns
 import numpy as np
-from typing import List, Dict
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Optional, Tuple
 import os
+import threading
+from src.downsampling import downsample
+
+# Figures are kept per thread and cleared between renders, so worker
+# processes do not pay for figure and canvas construction on every chart.
+# Thread-local, because in-process rendering may run in several pipeline threads
+_FIGURES = threading.local()
+
+def _init_style():
+    # The 'seaborn' style name was removed from matplotlib; set_theme is the supported equivalent
+    sns.set_theme(palette="husl")
+
+def _get_figure(name: str, figsize: Tuple[float, float]) -> Figure:
+    """
+    Get a cleared, reusable Agg figure.
+
+    Args:
+        name: Key identifying the chart type
+        figsize: Figure size in inches
+
+    Returns:
+        Empty figure attached to an Agg canvas
+    """
+    if not hasattr(_FIGURES, 'figures'):
+        _FIGURES.figures = {}
+    figures = _FIGURES.figures
+    fig = figures.get(name)
+    if fig is None:
+        fig = Figure(figsize=figsize)
+        FigureCanvasAgg(fig)
+        figures[name] = fig
+    else:
+        fig.clf()
+        fig.set_size_inches(figsize)
+    return fig
+
+def _render_sentiment_timeline(times: np.ndarray, scores: np.ndarray, output_path: str) -> str:
+    fig = _get_figure('sentiment_timeline', (12, 6))
+    ax = fig.add_subplot(1, 1, 1)
+
+    ax.plot(times, scores, marker='o' if len(times) <= 200 else None)
+    ax.set_title('Sentiment Analysis Timeline')
+    ax.set_xlabel('Time (seconds)')
+    ax.set_ylabel('Sentiment Score')
+    ax.grid(True)
+
+    fig.savefig(output_path)
+    return output_path
+
+def _render_frame_analysis(frame_x: np.ndarray, brightness: np.ndarray, contrast_x: np.ndarray,
+                           contrast: np.ndarray, output_path: str) -> str:
+    fig = _get_figure('frame_analysis', (12, 8))
+    ax1, ax2 = fig.subplots(2, 1)
+
+    # Plot brightness
+    ax1.plot(frame_x, brightness, label='Brightness')
+    ax1.set_title('Frame Brightness Over Time')
+    ax1.set_xlabel('Frame Number')
+    ax1.set_ylabel('Brightness')
+    ax1.grid(True)
+
+    # Plot contrast
+    ax2.plot(contrast_x, contrast, label='Contrast')
+    ax2.set_title('Frame Contrast Over Time')
+    ax2.set_xlabel('Frame Number')
+    ax2.set_ylabel('Contrast')
+    ax2.grid(True)
+
+    fig.tight_layout()
+    fig.savefig(output_path)
+    return output_path
+
+def _render_summary(scores: np.ndarray, times: np.ndarray, timeline_scores: np.ndarray, brightness: np.ndarray,
+                    scatter_brightness: np.ndarray, scatter_contrast: np.ndarray, output_path: str) -> str:
+    fig = _get_figure('summary_visualization', (15, 10))
+    (ax1, ax2), (ax3, ax4) = fig.subplots(2, 2)
+
+    # Plot 1: Sentiment Distribution
+    sns.histplot(scores, bins=20, ax=ax1)
+    ax1.set_title('Sentiment Score Distribution')
+    ax1.set_xlabel('Sentiment Score')
+    ax1.set_ylabel('Frequency')
+
+    # Plot 2: Frame Brightness Distribution
+    sns.histplot(brightness, bins=20, ax=ax2)
+    ax2.set_title('Frame Brightness Distribution')
+    ax2.set_xlabel('Brightness')
+    ax2.set_ylabel('Frequency')
+
+    # Plot 3: Sentiment vs Time
+    ax3.plot(times, timeline_scores)
+    ax3.set_title('Sentiment Over Time')
+    ax3.set_xlabel('Time (seconds)')
+    ax3.set_ylabel('Sentiment Score')
+
+    # Plot 4: Frame Statistics
+    ax4.scatter(scatter_brightness, scatter_contrast, alpha=0.5)
+    ax4.set_title('Frame Brightness vs Contrast')
+    ax4.set_xlabel('Brightness')
+    ax4.set_ylabel('Contrast')
+
+    fig.tight_layout()
+    fig.savefig(output_path)
+    return output_path
+
+def _render_heatmap(data: np.ndarray, title: str, output_path: str) -> str:
+    fig = _get_figure('heatmap', (10, 8))
+    ax = fig.add_subplot(1, 1, 1)
+
+    # Annotations are unreadable (and slow) on large matrices
+    sns.heatmap(data, cmap='YlOrRd', annot=data.size <= 400, fmt='.2f', ax=ax)
+    ax.set_title(title)
+
+    fig.savefig(output_path)
+    return output_path
 
 class Visualizer:
-    def __init__(self):
+    def __init__(self, max_points: int = 2000, downsample_method: str = 'lttb', workers: Optional[int] = 0):
+        """
+        Args:
+            max_points: Maximum number of points plotted per series
+            downsample_method: 'lttb' or 'minmax'
+            workers: Number of worker processes for rendering charts in
+                parallel; None uses one per chart, 0 renders in-process.
+                Starting the pool takes seconds, so it only pays off for a
+                long-lived visualizer such as the one in service mode
+        """
+        self.max_points = max_points
+        self.downsample_method = downsample_method
+        self.workers = workers
+        self._executor = None
+        self._executor_lock = threading.Lock()
         # Set style for plots
-        plt.style.use('seaborn')
-        sns.set_palette("husl")
-        
-    def create_visualizations(self, frames: List[np.ndarray], sentiment: Dict, output_dir: str):
+        _init_style()
+
+    def create_visualizations(self, frames: List[np.ndarray], sentiment: Dict, output_dir: str,
+                              heatmaps: Optional[Dict[str, np.ndarray]] = None):
         """
         Create various visualizations for the video analysis.
-        
+
+        The charts are independent; with workers enabled they are rendered
+        concurrently in worker processes.
+
         Args:
             frames: List of video frames
             sentiment: Dictionary containing sentiment analysis results
             output_dir: Directory to save the visualizations
+            heatmaps: Optional mapping of heatmap titles to 2D arrays to render
+        """
+        try:
+            # Frame statistics are computed once here so only small arrays,
+            # not the frames themselves, are sent to the workers
+            brightness, contrast = self._frame_statistics(frames)
+        except Exception as e:
+            raise Exception(f"Error creating visualizations: {str(e)}")
+        self.create_feature_visualizations({'brightness': brightness, 'contrast': contrast},
+                                           sentiment, output_dir, heatmaps)
+
+    def create_feature_visualizations(self, features: Dict, sentiment: Dict, output_dir: str,
+                                      heatmaps: Optional[Dict[str, np.ndarray]] = None):
+        """
+        Create the visualizations from per-frame features instead of frames.
+
+        Args:
+            features: Dictionary with 'brightness' and 'contrast' arrays, one
+                value per sampled frame (see VideoProcessor.analyze_video)
+            sentiment: Dictionary containing sentiment analysis results
+            output_dir: Directory to save the visualizations
+            heatmaps: Optional mapping of heatmap titles to 2D arrays to render
         """
         try:
             # Create output directory if it doesn't exist
             os.makedirs(output_dir, exist_ok=True)
-            
-            # Generate different types of visualizations
-            self._plot_sentiment_timeline(sentiment, output_dir)
-            self._plot_frame_analysis(frames, output_dir)
-            self._create_summary_visualization(frames, sentiment, output_dir)
-            
+
+            brightness = np.asarray(features['brightness'], dtype=float)
+            contrast = np.asarray(features['contrast'], dtype=float)
+
+            jobs = [
+                self._sentiment_timeline_job(sentiment, output_dir),
+                self._frame_analysis_job(brightness, contrast, output_dir),
+                self._summary_job(sentiment, brightness, contrast, output_dir),
+            ]
+            for title, data in (heatmaps or {}).items():
+                jobs.append(self._heatmap_job(data, output_dir, title))
+
+            self._run_jobs(jobs)
+
         except Exception as e:
             raise Exception(f"Error creating visualizations: {str(e)}")
-            
+
+    def close(self):
+        """
+        Shut down the worker processes.
+        """
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+    def _run_jobs(self, jobs: List[tuple]) -> List[str]:
+        """
+        Render chart jobs, in parallel when workers are enabled.
+
+        Args:
+            jobs: List of (function, args) tuples
+
+        Returns:
+            List of output paths
+        """
+        if self.workers == 0 or len(jobs) == 1:
+            return [func(*args) for func, args in jobs]
+
+        # The visualizer may be shared by concurrent jobs (service mode)
+        with self._executor_lock:
+            if self._executor is None:
+                # The pool is started from a pipeline thread while other threads may be
+                # running model inference; forking then can copy held locks into the
+                # workers, so start them from a clean server process instead
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+                self._executor = ProcessPoolExecutor(max_workers=self.workers or len(jobs),
+                                                     mp_context=context, initializer=_init_style)
+        futures = [self._executor.submit(func, *args) for func, args in jobs]
+        return [future.result() for future in futures]
+
+    def _frame_statistics(self, frames: List[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        brightness = np.array([np.mean(frame) for frame in frames], dtype=float)
+        contrast = np.array([np.std(frame) for frame in frames], dtype=float)
+        return brightness, contrast
+
+    def _sentiment_series(self, sentiment: Dict) -> Tuple[np.ndarray, np.ndarray]:
+        # Keys are sentence indices or time offsets, possibly stored as strings
+        items = sorted((float(k), float(v)) for k, v in sentiment.items())
+        times = np.array([t for t, _ in items], dtype=float)
+        scores = np.array([s for _, s in items], dtype=float)
+        return times, scores
+
+    def _downsample(self, x: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        return downsample(x, y, self.max_points, self.downsample_method)
+
+    def _sentiment_timeline_job(self, sentiment: Dict, output_dir: str) -> tuple:
+        times, scores = self._downsample(*self._sentiment_series(sentiment))
+        output_path = os.path.join(output_dir, 'sentiment_timeline.png')
+        return _render_sentiment_timeline, (times, scores, output_path)
+
+    def _frame_analysis_job(self, brightness: np.ndarray, contrast: np.ndarray, output_dir: str) -> tuple:
+        frame_x = np.arange(len(brightness), dtype=float)
+        bx, by = self._downsample(frame_x, brightness)
+        cx, cy = self._downsample(frame_x, contrast)
+        output_path = os.path.join(output_dir, 'frame_analysis.png')
+        return _render_frame_analysis, (bx, by, cx, cy, output_path)
+
+    def _summary_job(self, sentiment: Dict, brightness: np.ndarray, contrast: np.ndarray, output_dir: str) -> tuple:
+        times, scores = self._sentiment_series(sentiment)
+        timeline_x, timeline_y = self._downsample(times, scores)
+
+        # Histograms use every value; the scatter only needs a bounded sample
+        if len(brightness) > self.max_points:
+            sample = np.linspace(0, len(brightness) - 1, self.max_points).astype(int)
+            scatter_brightness, scatter_contrast = brightness[sample], contrast[sample]
+        else:
+            scatter_brightness, scatter_contrast = brightness, contrast
+
+        output_path = os.path.join(output_dir, 'summary_visualization.png')
+        return _render_summary, (scores, timeline_x, timeline_y, brightness,
+                                 scatter_brightness, scatter_contrast, output_path)
+
+    def _heatmap_job(self, data: np.ndarray, output_dir: str, title: str) -> tuple:
+        output_path = os.path.join(output_dir, f'{title.lower().replace(" ", "_")}.png')
+        return _render_heatmap, (np.asarray(data), title, output_path)
+
     def _plot_sentiment_timeline(self, sentiment: Dict, output_dir: str):
         """
         Create a timeline visualization of sentiment analysis.
-        
+
         Args:
             sentiment: Dictionary containing sentiment analysis results
             output_dir: Directory to save the visualization
         """
         try:
-            plt.figure(figsize=(12, 6))
-            
-            # Extract timestamps and sentiment scores
-            timestamps = list(sentiment.keys())
-            scores = list(sentiment.values())
-            
-            # Create the plot
-            plt.plot(timestamps, scores, marker='o')
-            plt.title('Sentiment Analysis Timeline')
-            plt.xlabel('Time (seconds)')
-            plt.ylabel('Sentiment Score')
-            plt.grid(True)
-            
-            # Save the plot
-            output_path = os.path.join(output_dir, 'sentiment_timeline.png')
-            plt.savefig(output_path)
-            plt.close()
-            
+            func, args = self._sentiment_timeline_job(sentiment, output_dir)
+            func(*args)
+
         except Exception as e:
             raise Exception(f"Error plotting sentiment timeline: {str(e)}")
-            
+
     def _plot_frame_analysis(self, frames: List[np.ndarray], output_dir: str):
         """
         Create visualizations for frame analysis.
-        
+
         Args:
             frames: List of video frames
             output_dir: Directory to save the visualization
         """
         try:
-            # Calculate frame statistics
-            brightness = [np.mean(frame) for frame in frames]
-            contrast = [np.std(frame) for frame in frames]
-            
-            # Create subplots
-            fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 8))
-            
-            # Plot brightness
-            ax1.plot(brightness, label='Brightness')
-            ax1.set_title('Frame Brightness Over Time')
-            ax1.set_xlabel('Frame Number')
-            ax1.set_ylabel('Brightness')
-            ax1.grid(True)
-            
-            # Plot contrast
-            ax2.plot(contrast, label='Contrast')
-            ax2.set_title('Frame Contrast Over Time')
-            ax2.set_xlabel('Frame Number')
-            ax2.set_ylabel('Contrast')
-            ax2.grid(True)
-            
-            # Adjust layout and save
-            plt.tight_layout()
-            output_path = os.path.join(output_dir, 'frame_analysis.png')
-            plt.savefig(output_path)
-            plt.close()
-            
+            func, args = self._frame_analysis_job(*self._frame_statistics(frames), output_dir)
+            func(*args)
+
         except Exception as e:
             raise Exception(f"Error plotting frame analysis: {str(e)}")
-            
+
     def _create_summary_visualization(self, frames: List[np.ndarray], sentiment: Dict, output_dir: str):
         """
         Create a comprehensive summary visualization.
-        
+
         Args:
             frames: List of video frames
             sentiment: Dictionary containing sentiment analysis results
             output_dir: Directory to save the visualization
         """
         try:
-            # Create a figure with subplots
-            fig = plt.figure(figsize=(15, 10))
-            
-            # Plot 1: Sentiment Distribution
-            plt.subplot(2, 2, 1)
-            sentiment_scores = list(sentiment.values())
-            sns.histplot(sentiment_scores, bins=20)
-            plt.title('Sentiment Score Distribution')
-            plt.xlabel('Sentiment Score')
-            plt.ylabel('Frequency')
-            
-            # Plot 2: Frame Brightness Distribution
-            plt.subplot(2, 2, 2)
-            brightness = [np.mean(frame) for frame in frames]
-            sns.histplot(brightness, bins=20)
-            plt.title('Frame Brightness Distribution')
-            plt.xlabel('Brightness')
-            plt.ylabel('Frequency')
-            
-            # Plot 3: Sentiment vs Time
-            plt.subplot(2, 2, 3)
-            timestamps = list(sentiment.keys())
-            plt.plot(timestamps, sentiment_scores)
-            plt.title('Sentiment Over Time')
-            plt.xlabel('Time (seconds)')
-            plt.ylabel('Sentiment Score')
-            
-            # Plot 4: Frame Statistics
-            plt.subplot(2, 2, 4)
-            contrast = [np.std(frame) for frame in frames]
-            plt.scatter(brightness, contrast, alpha=0.5)
-            plt.title('Frame Brightness vs Contrast')
-            plt.xlabel('Brightness')
-            plt.ylabel('Contrast')
-            
-            # Adjust layout and save
-            plt.tight_layout()
-            output_path = os.path.join(output_dir, 'summary_visualization.png')
-            plt.savefig(output_path)
-            plt.close()
-            
+            func, args = self._summary_job(sentiment, *self._frame_statistics(frames), output_dir)
+            func(*args)
+
         except Exception as e:
             raise Exception(f"Error creating summary visualization: {str(e)}")
-            
+
     def create_heatmap(self, data: np.ndarray, output_dir: str, title: str = 'Heatmap'):
         """
         Create a heatmap visualization.
-        
+
         Args:
             data: 2D numpy array for heatmap
             output_dir: Directory to save the visualization
             title: Title for the heatmap
         """
         try:
-            plt.figure(figsize=(10, 8))
-            sns.heatmap(data, cmap='YlOrRd', annot=True, fmt='.2f')
-            plt.title(title)
-            
-            output_path = os.path.join(output_dir, f'{title.lower().replace(" ", "_")}.png')
-            plt.savefig(output_path)
-            plt.close()
-            
+            func, args = self._heatmap_job(data, output_dir, title)
+            func(*args)
+
         except Exception as e:
-            raise Exception(f"Error creating heatmap: {str(e)}") 
\ No newline at end of file
+            raise Exception(f"Error creating heatmap: {str(e)}")
@@ -0,0 +1,106 @@
+import time
+import threading
+import unittest
+from src.batching import MicroBatcher, QueueFullError
+
+class TestMicroBatcher(unittest.TestCase):
+    def setUp(self):
+        self.batches = []
+        self.batcher = None
+
+    def tearDown(self):
+        if self.batcher is not None:
+            self.batcher.close()
+
+    def _double(self, items):
+        self.batches.append(list(items))
+        return [item * 2 for item in items]
+
+    def test_combines_concurrent_items_into_one_batch(self):
+        self.batcher = MicroBatcher(self._double, max_batch_size=8, max_wait=1.0)
+        futures = [self.batcher.submit(i) for i in range(8)]
+        self.assertEqual([future.result(timeout=5) for future in futures], [i * 2 for i in range(8)])
+        # A full batch runs without waiting out max_wait
+        self.assertEqual(self.batches, [list(range(8))])
+
+    def test_splits_at_max_batch_size(self):
+        self.batcher = MicroBatcher(self._double, max_batch_size=3, max_wait=0.2)
+        self.assertEqual(self.batcher.map(list(range(7))), [i * 2 for i in range(7)])
+        self.assertEqual([len(batch) for batch in self.batches], [3, 3, 1])
+
+    def test_lone_item_waits_at_most_max_wait(self):
+        self.batcher = MicroBatcher(self._double, max_batch_size=8, max_wait=0.2)
+        start = time.monotonic()
+        self.assertEqual(self.batcher.submit(21).result(timeout=5), 42)
+        elapsed = time.monotonic() - start
+        self.assertGreaterEqual(elapsed, 0.15)
+        self.assertLess(elapsed, 2.0)
+
+    def test_items_within_wait_window_share_a_batch(self):
+        self.batcher = MicroBatcher(self._double, max_batch_size=8, max_wait=0.5)
+        first = self.batcher.submit(1)
+        time.sleep(0.05)
+        second = self.batcher.submit(2)
+        self.assertEqual((first.result(timeout=5), second.result(timeout=5)), (2, 4))
+        self.assertEqual(self.batches, [[1, 2]])
+
+    def test_failed_batch_is_retried_item_by_item(self):
+        def reject_negative(items):
+            self.batches.append(list(items))
+            if any(item < 0 for item in items):
+                raise ValueError('negative item')
+            return [item * 2 for item in items]
+
+        self.batcher = MicroBatcher(reject_negative, max_batch_size=3, max_wait=1.0)
+        futures = [self.batcher.submit(item) for item in (1, -1, 2)]
+        self.assertEqual(futures[0].result(timeout=5), 2)
+        self.assertEqual(futures[2].result(timeout=5), 4)
+        with self.assertRaises(ValueError):
+            futures[1].result(timeout=5)
+        self.assertEqual(self.batches, [[1, -1, 2], [1], [-1], [2]])
+
+    def test_wrong_result_count_fails_items(self):
+        self.batcher = MicroBatcher(lambda items: [], max_batch_size=1, max_wait=0.0)
+        with self.assertRaises(ValueError):
+            self.batcher.submit(1).result(timeout=5)
+
+    def test_full_queue_applies_backpressure(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def blocked(items):
+            started.set()
+            release.wait(5)
+            return items
+
+        self.batcher = MicroBatcher(blocked, max_batch_size=1, max_wait=0.0, max_queue=2)
+        try:
+            running = self.batcher.submit('running')
+            self.assertTrue(started.wait(5))
+            # The worker is busy, so these fill the queue
+            queued = [self.batcher.submit('a'), self.batcher.submit('b')]
+            self.assertEqual(self.batcher.pending(), 2)
+
+            with self.assertRaises(QueueFullError):
+                self.batcher.submit('c', block=False)
+            with self.assertRaises(QueueFullError):
+                self.batcher.submit('c', timeout=0.05)
+        finally:
+            release.set()
+
+        self.assertEqual(running.result(timeout=5), 'running')
+        self.assertEqual([future.result(timeout=5) for future in queued], ['a', 'b'])
+        # Space frees up once the worker catches up
+        self.assertEqual(self.batcher.submit('c', timeout=5).result(timeout=5), 'c')
+
+    def test_close_finishes_queued_items(self):
+        self.batcher = MicroBatcher(self._double, max_batch_size=2, max_wait=1.0)
+        futures = [self.batcher.submit(i) for i in range(5)]
+        self.batcher.close()
+        self.assertEqual([future.result(timeout=0) for future in futures], [0, 2, 4, 6, 8])
+        with self.assertRaises(RuntimeError):
+            self.batcher.submit(1)
+        self.batcher = None
+
+if __name__ == '__main__':
+    unittest.main()
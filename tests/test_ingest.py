@@ -0,0 +1,223 @@
+import os
+import re
+import json
+import shutil
+import hashlib
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from src.ingest import InputSpool
+
+class RangeHandler(BaseHTTPRequestHandler):
+    # Behaviour of the test server; reset by TestInputSpool.setUp
+    data = b''
+    etag = '"v1"'
+    ranges = True
+    unknown_total = False
+    honor_if_range = True
+    drop_after = None
+    requests = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        cls = type(self)
+        cls.requests.append(dict(self.headers))
+
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None and if_none_match == cls.etag:
+            self.send_response(304)
+            self.send_header('ETag', cls.etag)
+            self.end_headers()
+            return
+
+        match = re.match(r'bytes=(\d+)-(\d*)', self.headers.get('Range', ''))
+        if_range = self.headers.get('If-Range')
+        use_range = cls.ranges and match and (if_range is None or if_range == cls.etag or not cls.honor_if_range)
+
+        if use_range:
+            start = int(match.group(1))
+            if start >= len(cls.data):
+                self.send_response(416)
+                self.send_header('Content-Range', f'bytes */{len(cls.data)}')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            end = min(int(match.group(2)) if match.group(2) else len(cls.data) - 1, len(cls.data) - 1)
+            body = cls.data[start:end + 1]
+            total = '*' if cls.unknown_total else str(len(cls.data))
+            self.send_response(206)
+            self.send_header('Content-Range', f'bytes {start}-{end}/{total}')
+        else:
+            body = cls.data
+            self.send_response(200)
+
+        self.send_header('ETag', cls.etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+
+        if cls.drop_after is not None:
+            # Simulate a dropped connection once
+            cut, cls.drop_after = cls.drop_after, None
+            self.wfile.write(body[:cut])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+class TestInputSpool(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), RangeHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.url = f'http://127.0.0.1:{cls.server.server_port}/clip.mp4'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        RangeHandler.data = os.urandom(3 * 1024 * 1024 + 123)
+        RangeHandler.etag = '"v1"'
+        RangeHandler.ranges = True
+        RangeHandler.unknown_total = False
+        RangeHandler.honor_if_range = True
+        RangeHandler.drop_after = None
+        RangeHandler.requests = []
+        self.spool_dir = tempfile.mkdtemp()
+        self.spool = InputSpool(self.spool_dir, chunk_size=1024 * 1024)
+
+    def tearDown(self):
+        shutil.rmtree(self.spool_dir, ignore_errors=True)
+
+    def _read(self, path):
+        with open(path, 'rb') as f:
+            return f.read()
+
+    def _write_partial(self, data, etag):
+        url_key = hashlib.sha256(self.url.encode('utf-8')).hexdigest()
+        partial_path = os.path.join(self.spool_dir, 'partial', url_key)
+        with open(partial_path, 'wb') as f:
+            f.write(data)
+        with open(partial_path + '.json', 'w') as f:
+            json.dump({'etag': etag, 'last_modified': None, 'size': len(RangeHandler.data)}, f)
+
+    def test_full_body_without_range_support(self):
+        RangeHandler.ranges = False
+        path = self.spool.fetch(self.url)
+        self.assertEqual(self._read(path), RangeHandler.data)
+        self.assertEqual(len(RangeHandler.requests), 1)
+
+    def test_chunked_range_replies(self):
+        path = self.spool.fetch(self.url)
+        self.assertEqual(self._read(path), RangeHandler.data)
+        self.assertEqual(len(RangeHandler.requests), 4)
+        self.assertTrue(path.endswith('.mp4'))
+        self.assertEqual(os.path.basename(path), hashlib.sha256(RangeHandler.data).hexdigest() + '.mp4')
+
+    def test_resumes_from_partial_file(self):
+        self._write_partial(RangeHandler.data[:1500000], '"v1"')
+        path = self.spool.fetch(self.url)
+        self.assertEqual(self._read(path), RangeHandler.data)
+        first = RangeHandler.requests[0]
+        self.assertEqual(first['Range'], f'bytes=1500000-{1500000 + 1024 * 1024 - 1}')
+        self.assertEqual(first['If-Range'], '"v1"')
+
+    def test_resumes_after_dropped_connection(self):
+        RangeHandler.drop_after = 1000
+        path = self.spool.fetch(self.url)
+        self.assertEqual(self._read(path), RangeHandler.data)
+        self.assertEqual(RangeHandler.requests[1]['Range'], f'bytes=1000-{1000 + 1024 * 1024 - 1}')
+
+    def test_etag_change_restarts_download(self):
+        old = RangeHandler.data
+        self._write_partial(old[:1500000], '"v1"')
+        RangeHandler.data = os.urandom(len(old))
+        RangeHandler.etag = '"v2"'
+        path = self.spool.fetch(self.url)
+        self.assertEqual(self._read(path), RangeHandler.data)
+
+    def test_etag_change_restarts_when_if_range_ignored(self):
+        old = RangeHandler.data
+        self._write_partial(old[:1500000], '"v1"')
+        RangeHandler.data = os.urandom(len(old))
+        RangeHandler.etag = '"v2"'
+        RangeHandler.honor_if_range = False
+        path = self.spool.fetch(self.url)
+        self.assertEqual(self._read(path), RangeHandler.data)
+
+    def test_unknown_total_size(self):
+        RangeHandler.unknown_total = True
+        path = self.spool.fetch(self.url)
+        self.assertEqual(self._read(path), RangeHandler.data)
+
+    def test_unknown_total_size_ending_on_chunk_boundary(self):
+        RangeHandler.unknown_total = True
+        RangeHandler.data = os.urandom(2 * 1024 * 1024)
+        path = self.spool.fetch(self.url)
+        self.assertEqual(self._read(path), RangeHandler.data)
+
+    def test_reuses_unchanged_download(self):
+        path = self.spool.fetch(self.url)
+        RangeHandler.requests = []
+        self.assertEqual(self.spool.resolve(self.url), path)
+        # Only the conditional revalidation request
+        self.assertEqual(len(RangeHandler.requests), 1)
+        self.assertEqual(RangeHandler.requests[0]['If-None-Match'], '"v1"')
+
+    def test_refetches_changed_resource(self):
+        self.spool.fetch(self.url)
+        RangeHandler.data = os.urandom(1024)
+        RangeHandler.etag = '"v2"'
+        path = self.spool.resolve(self.url)
+        self.assertEqual(self._read(path), RangeHandler.data)
+
+    def test_evicts_least_recently_used_object(self):
+        spool = InputSpool(self.spool_dir, chunk_size=1024 * 1024, max_bytes=5 * 1024 * 1024)
+        first = spool.fetch(self.url)
+        RangeHandler.data = os.urandom(len(RangeHandler.data))
+        second = spool.fetch(self.url.replace('clip', 'other'))
+        self.assertFalse(os.path.exists(first))
+        self.assertTrue(os.path.exists(second))
+        # The evicted URL's index entry went with it
+        self.assertEqual(len(os.listdir(os.path.join(self.spool_dir, 'urls'))), 1)
+
+    def test_evicts_superseded_object_first(self):
+        spool = InputSpool(self.spool_dir, chunk_size=1024 * 1024, max_bytes=7 * 1024 * 1024)
+        superseded = spool.fetch(self.url)
+        RangeHandler.data = os.urandom(len(RangeHandler.data))
+        other = spool.fetch(self.url.replace('clip', 'other'))
+        os.utime(other, (0, 0))
+
+        RangeHandler.data = os.urandom(len(RangeHandler.data))
+        RangeHandler.etag = '"v2"'
+        current = spool.resolve(self.url)
+        self.assertFalse(os.path.exists(superseded))
+        self.assertTrue(os.path.exists(other))
+        self.assertEqual(self._read(current), RangeHandler.data)
+
+    def test_evicts_abandoned_partial_downloads(self):
+        partial_dir = os.path.join(self.spool_dir, 'partial')
+        abandoned = os.path.join(partial_dir, 'abandoned')
+        with open(abandoned, 'wb') as f:
+            f.write(os.urandom(len(RangeHandler.data)))
+        os.utime(abandoned, (0, 0))
+        recent = os.path.join(partial_dir, 'recent')
+        with open(recent, 'wb') as f:
+            f.write(b'resumable')
+
+        spool = InputSpool(self.spool_dir, chunk_size=1024 * 1024, max_bytes=5 * 1024 * 1024)
+        path = spool.fetch(self.url)
+        self.assertFalse(os.path.exists(abandoned))
+        self.assertTrue(os.path.exists(recent))
+        self.assertTrue(os.path.exists(path))
+
+    def test_local_paths_are_not_fetched(self):
+        self.assertEqual(self.spool.resolve('/videos/input.mp4'), '/videos/input.mp4')
+        self.assertEqual(RangeHandler.requests, [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,168 @@
+import os
+import glob
+import shutil
+import tempfile
+import threading
+import unittest
+from src.artifacts import ArtifactStore
+from src.pipeline import Pipeline, PipelineError
+
+def square(x):
+    # Module level so it can run as a process stage
+    return x * x
+
+class TestPipeline(unittest.TestCase):
+    def test_runs_stages_in_dependency_order(self):
+        pipeline = Pipeline()
+        pipeline.add_stage('double', lambda x: x * 2, ['x'], ['doubled'])
+        pipeline.add_stage('add', lambda doubled, x: doubled + x, ['doubled', 'x'], ['total'])
+        results = pipeline.run({'x': 3})
+        self.assertEqual(results['doubled'], 6)
+        self.assertEqual(results['total'], 9)
+
+    def test_independent_stages_run_concurrently(self):
+        # Each stage waits for the other to start; run serially this would time out
+        barrier = threading.Barrier(2, timeout=5)
+
+        def meet(x):
+            barrier.wait()
+            return x
+
+        pipeline = Pipeline(max_threads=2)
+        pipeline.add_stage('a', meet, ['x'], ['a'])
+        pipeline.add_stage('b', meet, ['x'], ['b'])
+        results = pipeline.run({'x': 1})
+        self.assertEqual((results['a'], results['b']), (1, 1))
+
+    def test_multiple_outputs(self):
+        pipeline = Pipeline()
+        pipeline.add_stage('split', lambda x: (x, -x), ['x'], ['pos', 'neg'])
+        results = pipeline.run({'x': 2})
+        self.assertEqual((results['pos'], results['neg']), (2, -2))
+
+    def test_wrong_number_of_outputs_fails_stage(self):
+        pipeline = Pipeline()
+        pipeline.add_stage('split', lambda x: x, ['x'], ['pos', 'neg'])
+        with self.assertRaises(PipelineError) as context:
+            pipeline.run({'x': 2})
+        self.assertEqual(context.exception.stage, 'split')
+
+    def test_failure_stops_dependent_stages(self):
+        calls = []
+
+        def fail(x):
+            raise RuntimeError('boom')
+
+        pipeline = Pipeline()
+        pipeline.add_stage('fail', fail, ['x'], ['y'])
+        pipeline.add_stage('after', lambda y: calls.append(y), ['y'])
+        with self.assertRaises(PipelineError) as context:
+            pipeline.run({'x': 1})
+        self.assertEqual(context.exception.stage, 'fail')
+        self.assertIsInstance(context.exception.error, RuntimeError)
+        self.assertEqual(calls, [])
+
+    def test_inline_stage_runs_on_calling_thread(self):
+        threads = []
+        pipeline = Pipeline()
+        pipeline.add_stage('where', lambda x: threads.append(threading.current_thread()), ['x'], kind='inline')
+        pipeline.run({'x': 1})
+        self.assertEqual(threads, [threading.current_thread()])
+
+    def test_inline_stage_failure(self):
+        def fail(x):
+            raise ValueError('bad')
+
+        pipeline = Pipeline()
+        pipeline.add_stage('fail', fail, ['x'], ['y'], kind='inline')
+        with self.assertRaises(PipelineError) as context:
+            pipeline.run({'x': 1})
+        self.assertEqual(context.exception.stage, 'fail')
+
+    def test_process_stage(self):
+        pipeline = Pipeline(max_processes=1)
+        pipeline.add_stage('square', square, ['x'], ['y'], kind='process')
+        self.assertEqual(pipeline.run({'x': 7})['y'], 49)
+
+    def test_validate_rejects_invalid_graphs(self):
+        missing = Pipeline().add_stage('a', lambda y: y, ['y'], ['z'])
+        with self.assertRaises(ValueError):
+            missing.validate(['x'])
+
+        duplicate = Pipeline().add_stage('a', lambda x: x, ['x'], ['y']).add_stage('b', lambda x: x, ['x'], ['y'])
+        with self.assertRaises(ValueError):
+            duplicate.validate(['x'])
+
+        cycle = Pipeline().add_stage('a', lambda b: b, ['b'], ['a']).add_stage('b', lambda a: a, ['a'], ['b'])
+        with self.assertRaises(ValueError):
+            cycle.validate([])
+
+        with self.assertRaises(ValueError):
+            Pipeline().add_stage('a', lambda: None).add_stage('a', lambda: None)
+
+class TestPipelineCache(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.calls = {'upper': 0, 'length': 0}
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def _pipeline(self, suffix='!'):
+        def upper(text):
+            self.calls['upper'] += 1
+            return text.upper() + suffix
+
+        def length(shout):
+            self.calls['length'] += 1
+            return len(shout)
+
+        pipeline = Pipeline(store=ArtifactStore(self.root, version='test'))
+        pipeline.add_stage('upper', upper, ['text'], ['shout'], cache={'suffix': suffix})
+        pipeline.add_stage('length', length, ['shout'], ['length'], cache={})
+        return pipeline
+
+    def test_reuses_artifacts_across_runs(self):
+        first = self._pipeline().run({'text': 'hi'})
+        second = self._pipeline().run({'text': 'hi'})
+        self.assertEqual(first['length'], second['length'])
+        self.assertEqual(second['shout'], 'HI!')
+        self.assertEqual(self.calls, {'upper': 1, 'length': 1})
+
+    def test_config_change_recomputes_stage_and_dependents(self):
+        self._pipeline().run({'text': 'hi'})
+        results = self._pipeline(suffix='!!').run({'text': 'hi'})
+        self.assertEqual(results['length'], 4)
+        self.assertEqual(self.calls, {'upper': 2, 'length': 2})
+
+    def test_input_change_recomputes(self):
+        self._pipeline().run({'text': 'hi'})
+        self._pipeline().run({'text': 'hello'})
+        self.assertEqual(self.calls, {'upper': 2, 'length': 2})
+
+    def test_corrupt_artifact_is_recomputed(self):
+        self._pipeline().run({'text': 'hi'})
+        for path in glob.glob(os.path.join(self.root, '*', '*', '*.pkl')):
+            with open(path, 'wb') as f:
+                f.write(b'not a pickle')
+        results = self._pipeline().run({'text': 'hi'})
+        self.assertEqual(results['length'], 3)
+        self.assertEqual(self.calls, {'upper': 2, 'length': 2})
+
+        # The recomputed outputs replaced the corrupt artifacts
+        self._pipeline().run({'text': 'hi'})
+        self.assertEqual(self.calls, {'upper': 2, 'length': 2})
+
+    def test_artifact_evicted_before_load_is_recomputed(self):
+        self._pipeline().run({'text': 'hi'})
+        pipeline = self._pipeline()
+
+        def evicted(key):
+            raise FileNotFoundError(key)
+
+        pipeline.store.load = evicted
+        self.assertEqual(pipeline.run({'text': 'hi'})['shout'], 'HI!')
+        self.assertEqual(self.calls, {'upper': 2, 'length': 2})
+
+if __name__ == '__main__':
+    unittest.main()